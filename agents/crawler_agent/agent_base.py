@@ -1,7 +1,17 @@
 from python_a2a import A2AServer, Message, MessageRole, TextContent, run_server
 from datetime import datetime
-import feedparser, hashlib, yaml, json
+import feedparser, hashlib, yaml
 import asyncio
+import os
+import sys
+from feed_fetcher import FeedFetcher
+from feed_cache import FeedCache
+from seen_store import SeenStore
+from article_filter import ArticleFilter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from payloads import encode
+from tracing import Tracer, traced_handler
 
 class CrawlerAgent(A2AServer):
     """
@@ -13,43 +23,77 @@ class CrawlerAgent(A2AServer):
         with open("agents/crawler_agent/config.yaml") as f:
             self.config = yaml.safe_load(f)
 
+        self.article_filter = ArticleFilter.from_config(self.config)
+        fetch_cfg = self.config.get("fetch", {})
+        self.fetch_mode = fetch_cfg.get("mode", "sequential")
+        self.fetcher = FeedFetcher(
+            max_concurrency=fetch_cfg.get("max_concurrency", 20),
+            per_host_limit=fetch_cfg.get("per_host_limit", 4),
+            timeout=fetch_cfg.get("timeout", 15)
+        )
+        cache_path = self.config.get("cache", {}).get("path")
+        self.feed_cache = FeedCache(cache_path) if cache_path else None
+        seen_cfg = self.config.get("seen_store", {})
+        self.seen_store = SeenStore(seen_cfg["path"], ttl_days=seen_cfg.get("ttl_days", 30)) if seen_cfg.get("path") else None
+        self.tracer = Tracer.from_env("CrawlerAgent")
+
     def handle_message(self, message):
         """Synchronous handler that calls the async handler."""
         print("[CrawlerAgent] handle_message called (sync)")
-        return asyncio.run(self.handle_message_async(message))
+        return asyncio.run(traced_handler(self.tracer, message, self.handle_message_async))
 
     def fetch_articles(self):
         articles = []
         for feed_url in self.config["feeds"]:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries:
-                if self.is_valid(entry):
-                    articles.append({
-                        "id": self.hash_id(entry.title + entry.link),
-                        "title": entry.title,
-                        "link": entry.link,
-                        "content": entry.get("summary", entry.get("description", "")),
-                        "published": entry.get("published", str(datetime.utcnow())),
-                        "source": feed_url
-                    })
+            if self.feed_cache:
+                validators = self.feed_cache.get(feed_url)
+                feed = feedparser.parse(feed_url, etag=validators.get("etag"), modified=validators.get("last_modified"))
+                if feed.get("status") == 304:
+                    print(f"[CrawlerAgent] Feed not modified: {feed_url}")
+                    continue
+                self.feed_cache.update(feed_url, etag=feed.get("etag"), last_modified=feed.get("modified"))
+            else:
+                feed = feedparser.parse(feed_url)
+            articles.extend(self.collect_articles(feed, feed_url))
+        return self.only_new(articles)
+
+    async def fetch_articles_async(self):
+        """Download all feeds concurrently, then parse the downloaded bytes."""
+        articles = []
+        for result in await self.fetcher.fetch_all(self.config["feeds"], cache=self.feed_cache):
+            if not result["changed"]:
+                if result["error"] is None:
+                    print(f"[CrawlerAgent] Feed not modified: {result['url']}")
+                continue
+            feed = feedparser.parse(result["body"], response_headers=result["headers"])
+            articles.extend(self.collect_articles(feed, result["url"]))
+        return self.only_new(articles)
+
+    def only_new(self, articles):
+        """Drop articles already sent downstream in an earlier crawl."""
+        if not self.seen_store:
+            return articles
+        self.seen_store.prune()
+        new_articles = self.seen_store.filter_new(articles)
+        print(f"[CrawlerAgent] {len(new_articles)} of {len(articles)} articles are new")
+        return new_articles
+
+    def collect_articles(self, feed, feed_url):
+        articles = []
+        for entry in feed.entries:
+            if self.is_valid(entry):
+                articles.append({
+                    "id": self.hash_id(entry.title + entry.link),
+                    "title": entry.title,
+                    "link": entry.link,
+                    "content": entry.get("summary", entry.get("description", "")),
+                    "published": entry.get("published", str(datetime.utcnow())),
+                    "source": feed_url
+                })
         return articles
 
     def is_valid(self, entry):
-        title = entry.title.lower()
-        summary = entry.get("summary", "").lower()
-        cfg = self.config
-
-        # Exclude rules
-        if any(ex in title or ex in summary for ex in cfg["categories"].get("exclude", [])):
-            return True
-        # Include rules
-        if cfg["categories"].get("include") and not any(inc in title or inc in summary for inc in cfg["categories"]["include"]):
-            return True
-        # Keyword filter
-        if cfg.get("keywords") and not any(kw.lower() in title or kw.lower() in summary for kw in cfg["keywords"]):
-            return True
-
-        return True
+        return self.article_filter.accepts(f"{entry.title}\n{entry.get('summary', '')}")
 
     def hash_id(self, text):
         return hashlib.md5(text.encode()).hexdigest()
@@ -57,14 +101,27 @@ class CrawlerAgent(A2AServer):
     async def handle_message_async(self, message: Message) -> Message:
         print("[CrawlerAgent] handle_message_async called with:", message.content)
         if isinstance(message.content, TextContent):
-            articles = self.fetch_articles()
+            with self.tracer.span("fetch_feeds", mode=self.fetch_mode, feeds=len(self.config["feeds"])) as span:
+                if self.fetch_mode == "async":
+                    articles = await self.fetch_articles_async()
+                else:
+                    articles = self.fetch_articles()
+                span.set(items=len(articles))
             print("[CrawlerAgent] Articles fetched:", len(articles))
 
             # You can extend this to return filtered articles per query if needed
-            content = json.dumps(articles[:5], indent=2)  # return top 5 for brevity
+            batch = articles[:5]  # return top 5 for brevity
+            if self.seen_store:
+                # Only what is actually sent is marked; the rest stays new for the next crawl.
+                self.seen_store.mark_seen(article["id"] for article in batch)
+            if self.feed_cache:
+                # Feeds with unsent articles keep their old validators, so the
+                # next crawl re-reads them instead of getting a 304.
+                self.feed_cache.commit(skip={article["source"] for article in articles[len(batch):]})
+                self.feed_cache.save()
 
             return Message(
-                content=TextContent(text=f"Here are the latest articles:\n{content}"),
+                content=TextContent(text=encode("articles", batch)),
                 role=MessageRole.AGENT,
                 parent_message_id=message.message_id,
                 conversation_id=message.conversation_id
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+
+class FeedCache:
+    """
+    Persistent per-feed validators (ETag, Last-Modified and body hash) used
+    for conditional GETs, stored as a small JSON file.
+
+    Updates are staged until ``commit``: a feed whose new articles were not
+    all sent downstream keeps its old validators, so the next crawl fetches
+    and parses it again instead of getting a 304 and losing the backlog.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.staged = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[FeedCache] Ignoring unreadable cache {path}: {e}")
+
+    @staticmethod
+    def body_hash(body):
+        return hashlib.sha256(body).hexdigest()
+
+    def request_headers(self, feed_url):
+        """Conditional request headers for a feed, empty if never fetched."""
+        entry = self.entries.get(feed_url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, feed_url):
+        return self.entries.get(feed_url, {})
+
+    def update(self, feed_url, etag=None, last_modified=None, body_hash=None):
+        entry = dict(self.staged.get(feed_url, self.entries.get(feed_url, {})))
+        entry["etag"] = etag
+        entry["last_modified"] = last_modified
+        if body_hash is not None:
+            entry["body_hash"] = body_hash
+        self.staged[feed_url] = entry
+
+    def commit(self, skip=()):
+        """Apply the staged updates except those of the feeds in ``skip``, then drop them all."""
+        for feed_url, entry in self.staged.items():
+            if feed_url not in skip:
+                self.entries[feed_url] = entry
+        self.staged = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,83 @@
+from collections import defaultdict
+from urllib.parse import urlsplit
+import asyncio
+import aiohttp
+
+USER_AGENT = "FactCheckingNewsAggregator/0.1 (+https://github.com/RAAHUL-tech/Fact_Checking_News_Aggregator)"
+
+
+class FeedFetcher:
+    """
+    Downloads RSS feeds concurrently, bounded by a global and a per-host limit.
+    """
+
+    def __init__(self, max_concurrency=20, per_host_limit=4, timeout=15):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+    async def fetch_all(self, feed_urls, cache=None):
+        """
+        Fetch every feed and return one result dict per URL, in input order.
+        With a FeedCache, requests are conditional and ``changed`` is False
+        for feeds answered with 304 or whose body hash did not change.
+        """
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+
+        async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}) as session:
+            return await asyncio.gather(*(
+                self._fetch(session, url, global_limit, host_limits[urlsplit(url).netloc], cache)
+                for url in feed_urls
+            ))
+
+    async def _fetch(self, session, feed_url, global_limit, host_limit, cache=None):
+        result = {"url": feed_url, "status": None, "headers": {}, "body": None, "changed": False, "error": None}
+        request_headers = cache.request_headers(feed_url) if cache else {}
+        async with global_limit, host_limit:
+            # The timeout starts once a slot is acquired, so queueing behind
+            # other feeds never counts against this feed's budget.
+            try:
+                async with asyncio.timeout(self.timeout):
+                    async with session.get(feed_url, headers=request_headers) as response:
+                        result["status"] = response.status
+                        result["headers"] = {k.lower(): v for k, v in response.headers.items()}
+                        if response.status == 200:
+                            result["body"] = await response.read()
+                            result["changed"] = True
+                        elif response.status != 304:
+                            result["error"] = f"HTTP {response.status}"
+            except TimeoutError:
+                result["error"] = f"Timed out after {self.timeout}s"
+            except aiohttp.ClientError as e:
+                result["error"] = str(e)
+
+        if result["error"]:
+            print(f"[FeedFetcher] Failed to fetch {feed_url}: {result['error']}")
+        elif cache:
+            self._update_cache(cache, result)
+        return result
+
+    def _update_cache(self, cache, result):
+        feed_url, headers = result["url"], result["headers"]
+        previous = cache.get(feed_url)
+        if result["status"] == 304:
+            # A 304 may carry refreshed validators; keep the old ones otherwise.
+            cache.update(
+                feed_url,
+                etag=headers.get("etag", previous.get("etag")),
+                last_modified=headers.get("last-modified", previous.get("last_modified"))
+            )
+            return
+
+        body_hash = cache.body_hash(result["body"])
+        if body_hash == previous.get("body_hash"):
+            # Servers without validator support still return identical bytes.
+            result["changed"] = False
+        cache.update(
+            feed_url,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            body_hash=body_hash
+        )
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+import time
+
+
+class SeenStore:
+    """
+    Durable set of article ids already sent downstream, backed by SQLite.
+    Entries older than the TTL are pruned so the store stays bounded.
+    """
+
+    def __init__(self, path, ttl_days=30):
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 3600
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS seen_at_idx ON seen (seen_at)")
+        self.prune()
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to use from
+        # the threads the A2A server dispatches requests on.
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def filter_new(self, articles):
+        """Return the articles whose ids are not in the store, without duplicates."""
+        ids = list({article["id"] for article in articles})
+        seen = set()
+        with self._connect() as conn:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT id FROM seen WHERE id IN ({placeholders})", chunk)
+                seen.update(row[0] for row in rows)
+
+        new_articles = []
+        for article in articles:
+            if article["id"] not in seen:
+                seen.add(article["id"])
+                new_articles.append(article)
+        return new_articles
+
+    def mark_seen(self, article_ids):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO seen (id, seen_at) VALUES (?, ?)",
+                [(article_id, now) for article_id in article_ids]
+            )
+
+    def prune(self):
+        """Forget ids older than the TTL and return how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+        if removed:
+            print(f"[SeenStore] Pruned {removed} expired article ids")
+        return removed
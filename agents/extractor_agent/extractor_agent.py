@@ -1,8 +1,12 @@
 from python_a2a import A2AServer, Message, TextContent, MessageRole, run_server
 import yaml
-import asyncio
-import aiohttp
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from payloads import Claim, PayloadError, decode, encode, is_envelope
+from mcp_client import AgentLoop, MCPClient, MCPToolError
+from tracing import traced_handler
 
 class ExtractorAgent(A2AServer):
     """An agent that extracts factual claims using MCP tools."""
@@ -12,10 +16,9 @@ class ExtractorAgent(A2AServer):
         with open("agents/extractor_agent/config.yaml") as f:
             self.config = yaml.safe_load(f)
 
-        mcp_host = self.config.get("mcp_host", "localhost")
-        mcp_port = self.config.get("mcp_port", 8000)
-        self.mcp_url = f"http://{mcp_host}:{mcp_port}"
-        print(f"[ExtractorAgent] Connecting to MCP server at: {self.mcp_url}")
+        self.mcp = MCPClient.from_config(self.config, name="ExtractorAgent")
+        self.loop = AgentLoop()
+        print(f"[ExtractorAgent] Connecting to MCP server at: {self.mcp.base_url}")
 
         # Init parent
         A2AServer.__init__(self)
@@ -23,44 +26,40 @@ class ExtractorAgent(A2AServer):
     def handle_message(self, message):
         """Synchronous handler that calls the async handler."""
         print("[ExtractorAgent] handle_message called (sync)")
-        return asyncio.run(self.handle_message_async(message))
+        return self.loop.run(traced_handler(self.mcp.tracer, message, self.handle_message_async))
+
+    async def extract_each(self, documents):
+        """One extract_claims call per (article_id, text) document."""
+        claims = []
+        for article_id, text in documents:
+            # Call MCP extract_claims tool; each text item is one claim
+            try:
+                result = await self.mcp.call_tool("extract_claims", text=text)
+            except MCPToolError as e:
+                print(f"[ExtractorAgent] extract_claims failed for article {article_id or '<text>'}: {e}")
+                continue
+            claims.extend(Claim(statement=claim, article_id=article_id) for claim in result)
+        return claims
 
-    async def call_mcp_tool(self, tool_name, **kwargs):
-        """Call MCP tool directly via HTTP."""
+    async def extract_batched(self, documents):
+        """Let extract_claims_batch pack the documents into as few LLM requests as the token budget allows."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.mcp_url}/tools/{tool_name}"
-                payload = kwargs
-                
-                print(f"[ExtractorAgent] Calling MCP tool {tool_name} with payload: {payload}")
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"[ExtractorAgent] MCP tool {tool_name} result: {result}")
-                        
-                        # Extract all text content from the MCP response
-                        if result.get("content") and len(result["content"]) > 0:
-                            # Collect all text items from the content array
-                            text_items = []
-                            for content_item in result["content"]:
-                                if content_item.get("type") == "text":
-                                    text_items.append(content_item.get("text", ""))
-                            
-                            if text_items:
-                                print(f"[ExtractorAgent] Extracted {len(text_items)} text items: {text_items}")
-                                return text_items
-                            else:
-                                return "No text content found in MCP response"
-                        else:
-                            return "No content in MCP response"
-                    else:
-                        error_text = await response.text()
-                        print(f"[ExtractorAgent] MCP tool {tool_name} failed: {response.status} - {error_text}")
-                        return f"Error: {response.status} - {error_text}"
-        except Exception as e:
-            print(f"[ExtractorAgent] Exception calling MCP tool {tool_name}: {e}")
-            return f"Exception: {str(e)}"
+            result = await self.mcp.call_tool_json(
+                "extract_claims_batch",
+                articles=[{"id": article_id, "text": text} for article_id, text in documents]
+            )
+        except MCPToolError as e:
+            print(f"[ExtractorAgent] extract_claims_batch failed: {e}")
+            return []
+
+        for article_id, error in result.get("errors", {}).items():
+            print(f"[ExtractorAgent] extract_claims_batch failed for article {article_id}: {error}")
+        claims = []
+        for article_id, _ in documents:
+            for claim in result.get("claims", {}).get(article_id, []):
+                if isinstance(claim, str):
+                    claims.append(Claim(statement=claim, article_id=article_id))
+        return claims
 
     async def handle_message_async(self, message):
         print("[ExtractorAgent] handle_message_async called with:", message.content)
@@ -68,24 +67,24 @@ class ExtractorAgent(A2AServer):
             if message.content.type == "text":
                 input_text = message.content.text.strip()
 
-                # Call MCP extract_claims tool
-                result = await self.call_mcp_tool("extract_claims", text=input_text)
+                if is_envelope(input_text):
+                    # Only the article text goes to the LLM, never ids, links or JSON syntax.
+                    articles = decode(input_text, "articles")
+                    documents = [(article.id, f"{article.title}\n\n{article.content}") for article in articles]
+                else:
+                    documents = [("", input_text)]
 
-                # Handle the result - it's now a list of claim strings
-                if isinstance(result, list):
-                    return Message(
-                        content=TextContent(text=json.dumps(result, indent=2)),
-                        role=MessageRole.AGENT,
-                        parent_message_id=message.message_id,
-                        conversation_id=message.conversation_id
-                    )
+                if len(documents) >= self.config.get("batch_threshold", 3):
+                    claims = await self.extract_batched(documents)
                 else:
-                    return Message(
-                        content=TextContent(text=f"Unexpected result format: {result}"),
-                        role=MessageRole.AGENT,
-                        parent_message_id=message.message_id,
-                        conversation_id=message.conversation_id
-                    )
+                    claims = await self.extract_each(documents)
+
+                return Message(
+                    content=TextContent(text=encode("claims", claims)),
+                    role=MessageRole.AGENT,
+                    parent_message_id=message.message_id,
+                    conversation_id=message.conversation_id
+                )
 
             # Fallback/default response
             return Message(
@@ -94,6 +93,13 @@ class ExtractorAgent(A2AServer):
                 parent_message_id=message.message_id,
                 conversation_id=message.conversation_id
             )
+        except PayloadError as e:
+            return Message(
+                content=TextContent(text=f"Invalid articles payload: {str(e)}"),
+                role=MessageRole.AGENT,
+                parent_message_id=message.message_id,
+                conversation_id=message.conversation_id
+            )
         except Exception as e:
             return Message(
                 content=TextContent(text=f"[ExtractorAgent Error] {str(e)}"),
@@ -2,7 +2,14 @@ from python_a2a import A2AServer, Message, TextContent, MessageRole, run_server,
 import yaml
 import json
 import asyncio
-import aiohttp
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from payloads import Claim, Verdict, PayloadError, decode, decode_items, encode, is_envelope
+from mcp_client import AgentLoop, MCPClient, MCPToolError
+from tracing import traced_handler
+from claim_dedup import ClaimIndex
 
 class FactCheckerAgent(A2AServer):
     """Agent that verifies factual claims using MCP Wikidata tool."""
@@ -12,10 +19,18 @@ class FactCheckerAgent(A2AServer):
         with open("agents/fact_checker_agent/config.yaml") as f:
             self.config = yaml.safe_load(f)
 
-        mcp_host = self.config.get("mcp_host", "localhost")
-        mcp_port = self.config.get("mcp_port", 8000)
-        self.mcp_url = f"http://{mcp_host}:{mcp_port}"
-        print(f"[FactCheckerAgent] Connecting to MCP server at: {self.mcp_url}")
+        self.mcp = MCPClient.from_config(self.config, name="FactCheckerAgent")
+        self.loop = AgentLoop()
+
+        # Near-duplicate claims share one verification (see claim_dedup.py).
+        dedup_config = self.config.get("dedup", {})
+        self.claim_index = ClaimIndex(
+            threshold=dedup_config.get("threshold", 0.8),
+            path=dedup_config.get("path"),
+            ttl_days=dedup_config.get("ttl_days", 30),
+            max_claims=dedup_config.get("max_claims", 100000)
+        ) if dedup_config.get("enabled", True) else None
+        print(f"[FactCheckerAgent] Connecting to MCP server at: {self.mcp.base_url}")
 
         # Init parent
         A2AServer.__init__(self)
@@ -23,38 +38,102 @@ class FactCheckerAgent(A2AServer):
     def handle_message(self, message):
         """Synchronous handler that calls the async handler."""
         print("[FactCheckerAgent] handle_message called (sync)")
-        return asyncio.run(self.handle_message_async(message))
+        return self.loop.run(traced_handler(self.mcp.tracer, message, self.handle_message_async))
 
-    async def call_mcp_tool(self, tool_name, **kwargs):
-        """Call MCP tool directly via HTTP."""
+    async def check_claim(self, claim):
+        """Look up one claim; failures come back as an {"error": ...} result."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.mcp_url}/tools/{tool_name}"
-                payload = kwargs
-                
-                print(f"[FactCheckerAgent] Calling MCP tool {tool_name} with payload: {payload}")
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"[FactCheckerAgent] MCP tool {tool_name} result: {result}")
-                        return result.get("content", [{}])[0].get("text", "")
-                    else:
-                        error_text = await response.text()
-                        print(f"[FactCheckerAgent] MCP tool {tool_name} failed: {response.status} - {error_text}")
-                        return f"Error: {response.status} - {error_text}"
-        except Exception as e:
-            print(f"[FactCheckerAgent] Exception calling MCP tool {tool_name}: {e}")
-            return f"Exception: {str(e)}"
+            result_data = await self.mcp.call_tool_json("check_wikidata", statement=claim.statement)
+            if not isinstance(result_data, dict):
+                raise MCPToolError(f"Unexpected check_wikidata result: {result_data}")
+            return result_data
+        except MCPToolError as e:
+            return {"error": str(e)}
+
+    async def check_claims_concurrently(self, claims):
+        """
+        Look up claims with at most ``max_concurrency`` calls in flight.
+        Results keep the input order and a failed lookup only affects its own claim.
+        """
+        semaphore = asyncio.Semaphore(self.config.get("max_concurrency", 8))
+
+        async def check(claim):
+            async with semaphore:
+                return await self.check_claim(claim)
+
+        lookups = await asyncio.gather(*(check(claim) for claim in claims), return_exceptions=True)
+        return [{"error": str(result)} if isinstance(result, Exception) else result for result in lookups]
+
+    async def check_claims_batched(self, claims):
+        """Look up claims via check_wikidata_batch, one MCP round-trip per chunk, chunks in parallel."""
+        batch_size = self.config.get("batch_size", 50)
+        semaphore = asyncio.Semaphore(self.config.get("max_concurrency", 8))
+
+        async def check_chunk(chunk):
+            try:
+                async with semaphore:
+                    chunk_results = await self.mcp.call_tool_json(
+                        "check_wikidata_batch",
+                        statements=[claim.statement for claim in chunk]
+                    )
+                if not isinstance(chunk_results, list) or len(chunk_results) != len(chunk):
+                    raise MCPToolError(f"Unexpected check_wikidata_batch result: {chunk_results}")
+                return chunk_results
+            except MCPToolError as e:
+                return [{"error": str(e)}] * len(chunk)
+
+        chunks = [claims[start:start + batch_size] for start in range(0, len(claims), batch_size)]
+        return [result for chunk_results in await asyncio.gather(*(check_chunk(c) for c in chunks)) for result in chunk_results]
+
+    def deduplicate(self, claims):
+        """
+        Group near-duplicate claims. Returns one lookup per group, made with
+        the group's canonical statement (possibly first seen in an earlier
+        run, so the server's verdict cache answers it), and, for each input
+        claim, the index of the lookup whose verdict it shares. Verdicts are
+        built from the input claims, so every claim keeps its own statement.
+        """
+        if self.claim_index is None:
+            return claims, list(range(len(claims)))
+        to_check, groups, shared = [], {}, []
+        for claim, canonical in zip(claims, self.claim_index.canonicalize([claim.statement for claim in claims])):
+            if canonical not in groups:
+                groups[canonical] = len(to_check)
+                to_check.append(Claim(statement=canonical, article_id=claim.article_id))
+            shared.append(groups[canonical])
+        if len(to_check) < len(claims):
+            print(f"[FactCheckerAgent] {len(claims)} claims, {len(to_check)} unique after near-duplicate detection")
+        return to_check, shared
+
+    def to_verdict(self, claim, result_data):
+        if not isinstance(result_data, dict) or result_data.get("error"):
+            return Verdict(
+                statement=claim.statement,
+                verified=False,
+                source="",
+                article_id=claim.article_id,
+                error=result_data.get("error") if isinstance(result_data, dict) else f"Unexpected result: {result_data}"
+            )
+        return Verdict(
+            statement=claim.statement,
+            verified=bool(result_data.get("verified", False)),
+            source=result_data.get("source", ""),
+            article_id=claim.article_id
+        )
 
     async def handle_message_async(self, message):
         print("[FactCheckerAgent] handle_message_async called with:", message.content)
         """Handles A2A message to check claims against Wikidata."""
         try:
             if message.content.type == "text":
+                text = message.content.text.strip()
                 try:
-                    claims = json.loads(message.content.text)
-                except json.JSONDecodeError as e:
+                    if is_envelope(text):
+                        claims = decode(text, "claims")
+                    else:
+                        # Plain JSON array of claim strings, e.g. typed by hand.
+                        claims = decode_items([{"statement": claim} for claim in json.loads(text)], "claims")
+                except (PayloadError, json.JSONDecodeError) as e:
                     return Message(
                         content=TextContent(text=f"Invalid JSON input: {str(e)}"),
                         role=MessageRole.AGENT,
@@ -62,46 +141,24 @@ class FactCheckerAgent(A2AServer):
                         conversation_id=message.conversation_id
                     )
 
-                results = []
-                for claim in claims:
-                    result = await self.call_mcp_tool("check_wikidata", statement=claim)
-                    try:
-                        # Parse the JSON response from the MCP tool
-                        if isinstance(result, str):
-                            result_data = json.loads(result)
-                        else:
-                            result_data = result
-                            
-                        if isinstance(result_data, dict) and result_data.get("error"):
-                            results.append({
-                                "statement": claim,
-                                "verified": False,
-                                "source": "",
-                                "error": result_data["error"]
-                            })
-                        else:
-                            results.append({
-                                "statement": claim,
-                                "verified": result_data.get("verified", False),
-                                "source": result_data.get("source", "")
-                            })
-                    except (json.JSONDecodeError, AttributeError) as e:
-                        results.append({
-                            "statement": claim,
-                            "verified": False,
-                            "source": "",
-                            "error": f"Failed to parse result: {str(e)}"
-                        })
+                with self.mcp.tracer.span("deduplicate", claims=len(claims)) as span:
+                    to_check, shared = self.deduplicate(claims)
+                    span.set(unique=len(to_check))
+                if len(to_check) >= self.config.get("batch_threshold", 5):
+                    lookups = await self.check_claims_batched(to_check)
+                else:
+                    lookups = await self.check_claims_concurrently(to_check)
+                results = [self.to_verdict(claim, lookups[index]) for claim, index in zip(claims, shared)]
 
                 return Message(
-                    content=TextContent(text=json.dumps(results, indent=2)),
+                    content=TextContent(text=encode("verdicts", results)),
                     role=MessageRole.AGENT,
                     parent_message_id=message.message_id,
                     conversation_id=message.conversation_id
                 )
 
             return Message(
-                content=TextContent(text="Please send a JSON array of claims as plain text."),
+                content=TextContent(text="Please send a claims payload or a JSON array of claims as plain text."),
                 role=MessageRole.AGENT,
                 parent_message_id=message.message_id,
                 conversation_id=message.conversation_id
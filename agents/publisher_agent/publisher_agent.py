@@ -1,8 +1,13 @@
 from python_a2a import A2AServer, Message, TextContent, MessageRole, run_server, A2AClient
 import yaml
 import json
-import asyncio
-import aiohttp
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from payloads import PayloadError, decode, decode_items, is_envelope
+from mcp_client import AgentLoop, MCPClient
+from tracing import traced_handler
 
 class PublisherAgent(A2AServer):
     """Agent that publishes verified facts to a Jekyll blog using MCP."""
@@ -12,10 +17,9 @@ class PublisherAgent(A2AServer):
         with open("agents/publisher_agent/config.yaml") as f:
             self.config = yaml.safe_load(f)
 
-        mcp_host = self.config.get("mcp_host", "localhost")
-        mcp_port = self.config.get("mcp_port", 8000)
-        self.mcp_url = f"http://{mcp_host}:{mcp_port}"
-        print(f"[PublisherAgent] Connecting to MCP server at: {self.mcp_url}")
+        self.mcp = MCPClient.from_config(self.config, name="PublisherAgent")
+        self.loop = AgentLoop()
+        print(f"[PublisherAgent] Connecting to MCP server at: {self.mcp.base_url}")
 
         # Initialize parent
         A2AServer.__init__(self)
@@ -23,37 +27,57 @@ class PublisherAgent(A2AServer):
     def handle_message(self, message):
         """Synchronous handler that calls the async handler."""
         print("[PublisherAgent] handle_message called (sync)")
-        return asyncio.run(self.handle_message_async(message))
+        return self.loop.run(traced_handler(self.mcp.tracer, message, self.handle_message_async))
 
-    async def call_mcp_tool(self, tool_name, **kwargs):
-        """Call MCP tool directly via HTTP."""
+    async def publish_claim(self, claim):
+        """Publish one verdict; returns 1 if a post was generated, else 0."""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.mcp_url}/tools/{tool_name}"
-                payload = kwargs
-                
-                print(f"[PublisherAgent] Calling MCP tool {tool_name} with payload: {payload}")
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"[PublisherAgent] MCP tool {tool_name} result: {result}")
-                        return result.get("content", [{}])[0].get("text", "")
-                    else:
-                        error_text = await response.text()
-                        print(f"[PublisherAgent] MCP tool {tool_name} failed: {response.status} - {error_text}")
-                        return f"Error: {response.status} - {error_text}"
+            result = "".join(await self.mcp.call_tool(
+                "generate_jekyll_post",
+                statement=claim.statement,
+                verified=claim.verified,
+                source=claim.source
+            ))
+            if "Generated Jekyll post" in result:
+                return 1
+            print(f"[PublisherAgent] Unexpected response: {result}")
         except Exception as e:
-            print(f"[PublisherAgent] Exception calling MCP tool {tool_name}: {e}")
-            return f"Exception: {str(e)}"
+            print(f"[PublisherAgent] MCP call failed for: {claim.statement}\nError: {e}")
+        return 0
+
+    async def publish_batched(self, claims):
+        """Publish verdicts via generate_jekyll_posts, one MCP round-trip per chunk."""
+        batch_size = self.config.get("batch_size", 50)
+        published_count = 0
+        for start in range(0, len(claims), batch_size):
+            chunk = claims[start:start + batch_size]
+            try:
+                result = await self.mcp.call_tool_json(
+                    "generate_jekyll_posts",
+                    posts=[{"statement": c.statement, "verified": c.verified, "source": c.source} for c in chunk]
+                )
+            except Exception as e:
+                print(f"[PublisherAgent] Batch publish of {len(chunk)} claims failed\nError: {e}")
+                continue
+            for claim, post in zip(chunk, result.get("posts", [])):
+                if "file" in post:
+                    published_count += 1
+                else:
+                    print(f"[PublisherAgent] Failed to publish: {claim.statement}\nError: {post.get('error')}")
+        return published_count
 
     async def handle_message_async(self, message):
         print("[PublisherAgent] handle_message_async called with:", message.content)
         try:
             if message.content.type == "text":
+                text = message.content.text.strip()
                 try:
-                    claims = json.loads(message.content.text)
-                except json.JSONDecodeError as e:
+                    if is_envelope(text):
+                        claims = decode(text, "verdicts")
+                    else:
+                        # Plain JSON list of verdict objects, e.g. typed by hand.
+                        claims = decode_items(json.loads(text), "verdicts")
+                except (PayloadError, json.JSONDecodeError) as e:
                     return Message(
                         content=TextContent(text=f"Invalid JSON input: {str(e)}"),
                         role=MessageRole.AGENT,
@@ -61,23 +85,13 @@ class PublisherAgent(A2AServer):
                         conversation_id=message.conversation_id
                     )
 
-                published_count = 0
-                for claim in claims:
-                    if "error" in claim:
-                        continue
-                    try:
-                        result = await self.call_mcp_tool(
-                            "generate_jekyll_post",
-                            statement=claim["statement"],
-                            verified=claim["verified"],
-                            source=claim["source"]
-                        )
-                        if "Generated Jekyll post" in result:
-                            published_count += 1
-                        else:
-                            print(f"[PublisherAgent] Unexpected response: {result}")
-                    except Exception as e:
-                        print(f"[PublisherAgent] MCP call failed for: {claim.get('statement')}\nError: {e}")
+                claims = [claim for claim in claims if not claim.error]
+                if len(claims) >= self.config.get("batch_threshold", 5):
+                    published_count = await self.publish_batched(claims)
+                else:
+                    published_count = 0
+                    for claim in claims:
+                        published_count += await self.publish_claim(claim)
 
                 return Message(
                     content=TextContent(text=f"✅ Published {published_count} claims to Jekyll."),
@@ -0,0 +1,242 @@
+"""
+Near-duplicate detection for extracted claims.
+
+The same claim comes back from several articles (and several runs) with
+trivial wording differences. Each claim is shingled into character n-grams
+and summarised by a MinHash signature; LSH banding finds candidate
+duplicates in constant time per claim, and a candidate counts as a
+duplicate when the signatures estimate a Jaccard similarity of at least
+``threshold``, it mentions exactly the same numbers (so "rose 3.2%" and
+"rose 3.5%" stay separate claims) and the words the two statements do not
+share contain no negation or antonym pair ("is not", "unsafe" vs "safe").
+Duplicates map to the first statement seen, so one verification can be
+shared by the whole group.
+"""
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import itertools
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+# Mersenne prime used for the universal hash family (a * x + b) mod P.
+_PRIME = (1 << 61) - 1
+
+
+def normalize_statement(statement):
+    """Fold case, punctuation and whitespace the same way as the server's verdict cache."""
+    return " ".join(re.sub(r"[^\w\s]", "", statement.casefold()).split())
+
+
+def numbers_in(normalized):
+    """The numbers a normalized statement mentions, in any order."""
+    return tuple(sorted(re.findall(r"\d+", normalized)))
+
+
+# Negations after normalize_statement, which drops apostrophes ("isn't" -> "isnt").
+NEGATIONS = frozenset({
+    "not", "no", "never", "nor", "none", "neither", "nobody", "nothing", "nowhere", "without",
+    "cannot", "cant", "isnt", "arent", "wasnt", "werent", "dont", "doesnt", "didnt", "wont",
+    "wouldnt", "couldnt", "shouldnt", "hasnt", "havent", "hadnt", "aint", "mustnt", "neednt"
+})
+ANTONYM_PREFIXES = ("un", "in", "im", "il", "ir", "non", "dis")
+
+
+def opposes(tokens_a, tokens_b):
+    """
+    Whether the words two statements do not share flip the meaning: a
+    negation on one side only, or a word and its prefixed antonym
+    ("safe" / "unsafe", "legal" / "illegal").
+    """
+    only_a, only_b = tokens_a - tokens_b, tokens_b - tokens_a
+    if (only_a | only_b) & NEGATIONS:
+        return True
+    return any(
+        x == prefix + y or y == prefix + x
+        for x in only_a for y in only_b for prefix in ANTONYM_PREFIXES
+    )
+
+
+class MinHasher:
+    """Computes MinHash signatures over character shingles of normalized text."""
+
+    def __init__(self, num_perm=64, shingle_size=4, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # A fixed seed keeps signatures comparable across processes and restarts.
+        rng = random.Random(seed)
+        self._params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def shingles(self, text):
+        text = normalize_statement(text)
+        n = self.shingle_size
+        if len(text) <= n:
+            return {text}
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def signature(self, text):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") % _PRIME
+            for shingle in self.shingles(text)
+        ]
+        return array("Q", [min((a * h + b) % _PRIME for h in hashes) for a, b in self._params])
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Fraction of agreeing positions, an unbiased estimate of the Jaccard similarity."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class ClaimIndex:
+    """
+    In-memory MinHash/LSH index of canonical claims, optionally persisted to
+    SQLite so duplicates are also recognised across runs.
+
+    Claims are forgotten ``ttl_days`` after they were added, and beyond
+    ``max_claims`` the oldest go first, both in memory and on disk, so a
+    long-running agent stays bounded.
+
+    ``num_perm`` must be divisible by ``bands``; with the defaults (64
+    permutations, 16 bands of 4 rows) pairs at Jaccard 0.8 become candidates
+    with over 99% probability, pairs below 0.3 rarely do.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=4, path=None, ttl_days=30,
+                 max_claims=100000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.max_claims = max_claims
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        # id -> (statement, normalized, signature, numbers, tokens, added_at), oldest first
+        self._claims = OrderedDict()
+        self._exact = {}        # normalized statement -> id
+        self._buckets = {}      # (band, band values) -> ids, as an insertion-ordered dict
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS claims "
+                    "(normalized TEXT PRIMARY KEY, statement TEXT NOT NULL, signature BLOB NOT NULL, added_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS claims_added_at ON claims (added_at)")
+                self._prune_disk(conn, time.time())
+                rows = conn.execute("SELECT statement, signature, added_at FROM claims ORDER BY added_at").fetchall()
+            for statement, blob, added_at in rows:
+                signature = array("Q")
+                signature.frombytes(blob)
+                if len(signature) == num_perm:
+                    self._insert(statement, signature, added_at)
+            if rows:
+                print(f"[ClaimIndex] Loaded {len(self._claims)} known claims from {path}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self._claims)
+
+    def _band_keys(self, signature):
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _insert(self, statement, signature, added_at):
+        claim_id = next(self._ids)
+        normalized = normalize_statement(statement)
+        self._claims[claim_id] = (
+            statement, normalized, signature, numbers_in(normalized), frozenset(normalized.split()), added_at
+        )
+        self._exact.setdefault(normalized, claim_id)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, {})[claim_id] = None
+        return claim_id
+
+    def _evict(self, now):
+        """Drop claims past the TTL and, beyond ``max_claims``, the oldest ones."""
+        cutoff = now - self.ttl_seconds
+        while self._claims:
+            claim_id, (_, normalized, signature, _, _, added_at) = next(iter(self._claims.items()))
+            if added_at >= cutoff and len(self._claims) <= self.max_claims:
+                break
+            del self._claims[claim_id]
+            if self._exact.get(normalized) == claim_id:
+                del self._exact[normalized]
+            for key in self._band_keys(signature):
+                bucket = self._buckets[key]
+                del bucket[claim_id]
+                if not bucket:
+                    del self._buckets[key]
+
+    def _prune_disk(self, conn, now):
+        conn.execute("DELETE FROM claims WHERE added_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM claims WHERE normalized NOT IN "
+            "(SELECT normalized FROM claims ORDER BY added_at DESC LIMIT ?)",
+            (self.max_claims,)
+        )
+
+    def _find(self, normalized, signature):
+        claim_id = self._exact.get(normalized)
+        if claim_id is not None:
+            return claim_id
+        numbers = numbers_in(normalized)
+        tokens = frozenset(normalized.split())
+        best_id, best_similarity = None, self.threshold
+        checked = set()
+        for key in self._band_keys(signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                _, _, candidate_signature, candidate_numbers, candidate_tokens, _ = self._claims[candidate]
+                if candidate_numbers != numbers or opposes(tokens, candidate_tokens):
+                    continue
+                similarity = estimate_similarity(signature, candidate_signature)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = candidate, similarity
+        return best_id
+
+    def canonicalize(self, statements):
+        """
+        Map each statement to the canonical statement of its near-duplicate
+        group, adding the ones that start a new group to the index.
+        """
+        canonical, added = [], []
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            for statement in statements:
+                normalized = normalize_statement(statement)
+                signature = self.hasher.signature(statement)
+                claim_id = self._find(normalized, signature)
+                if claim_id is None:
+                    claim_id = self._insert(statement, signature, now)
+                    added.append((normalized, statement, signature.tobytes()))
+                canonical.append(self._claims[claim_id][0])
+            self._evict(now)
+
+        if self.path and added:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO claims (normalized, statement, signature, added_at) VALUES (?, ?, ?, ?)",
+                    [(normalized, statement, blob, now) for normalized, statement, blob in added]
+                )
+                self._prune_disk(conn, now)
+        return canonical
@@ -0,0 +1,252 @@
+"""
+Rate-limit-aware scheduler for LLM requests made by the MCP server.
+
+Requests wait in a priority queue and are released only when both the
+request bucket (requests per minute) and the token bucket (tokens per
+minute) allow it, so sustained throughput sits at the provider limit
+instead of bursting into 429s. Rate-limit headers returned by the provider
+correct the token bucket and track the daily request allowance, and 429s
+push every request back by Retry-After or an exponential, jittered delay.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class RateLimitExceeded(Exception):
+    """Raised by a request function when the provider answered 429 (or is overloaded)."""
+
+    def __init__(self, message, retry_after=None, headers=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.headers = headers or {}
+
+
+def parse_duration(value):
+    """Parse Retry-After / reset values such as "7", "1.5s", "120ms" or "1m30.5s" into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Refills continuously at ``per_minute / 60`` per second. The capacity
+    holds ``burst_seconds`` worth of refill, so an idle bucket allows a short
+    burst rather than a whole minute's budget at once.
+    """
+
+    def __init__(self, per_minute, burst_seconds=60):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        # A request larger than the whole bucket only waits for a full bucket.
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount, now):
+        # May go negative when actual usage exceeds the estimate; later
+        # requests then wait for the debt to refill.
+        self._refill(now)
+        self.available -= amount
+
+    def observe_remaining(self, remaining, now):
+        """Trust the provider's count when it is lower than ours."""
+        self._refill(now)
+        self.available = min(self.available, float(remaining))
+
+
+@dataclass(order=True)
+class _Request:
+    priority: int
+    sequence: int
+    tokens: int = field(compare=False)
+    fn: object = field(compare=False)
+    future: Future = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class LLMScheduler:
+    """
+    Runs request functions under requests-per-minute and tokens-per-minute
+    budgets, highest priority (lowest number) first.
+
+    A request function returns ``(result, headers, tokens_used)`` and raises
+    RateLimitExceeded on 429. ``headers`` may carry Groq's rate-limit
+    headers: ``x-ratelimit-remaining-tokens`` is a per-minute count and
+    corrects the token bucket, while ``x-ratelimit-remaining-requests`` (with
+    ``x-ratelimit-reset-requests``) is the per-day request allowance, so once
+    it runs out requests are held until it resets.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, max_concurrency=4,
+                 max_attempts=5, base_backoff=1.0, max_backoff=60.0, burst_seconds=10):
+        self._requests = TokenBucket(requests_per_minute, burst_seconds)
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._backoff_until = 0.0
+        self._consecutive_limits = 0
+        self._daily_remaining = None    # requests left today, per the last headers
+        self._daily_reset_at = None
+        self._slots = threading.Semaphore(max_concurrency)
+        self._workers = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rate_limited": 0, "retried": 0}
+
+        threading.Thread(target=self._dispatch, name="llm-scheduler", daemon=True).start()
+
+    def submit(self, fn, estimated_tokens, priority=PRIORITY_INTERACTIVE):
+        """Queue a request and return a Future for its result."""
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._queue, _Request(priority, next(self._sequence), estimated_tokens, fn, future))
+            self._counters["submitted"] += 1
+            self._cond.notify()
+        return future
+
+    def run(self, fn, estimated_tokens, priority=PRIORITY_INTERACTIVE):
+        """Queue a request and block until its result is available."""
+        return self.submit(fn, estimated_tokens, priority).result()
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            return {
+                **self._counters,
+                "queued": len(self._queue),
+                "backoff_seconds": round(max(0.0, self._backoff_until - now), 2),
+                "requests_available": round(self._requests.available, 1),
+                "tokens_available": round(self._tokens.available, 1),
+                "daily_requests_remaining": self._daily_remaining
+            }
+
+    def _daily_wait(self, now):
+        """Seconds until the daily request allowance resets, if it is used up."""
+        if self._daily_reset_at is not None and now >= self._daily_reset_at:
+            self._daily_remaining = self._daily_reset_at = None
+        if self._daily_remaining is None or self._daily_remaining >= 1 or self._daily_reset_at is None:
+            return 0.0
+        return self._daily_reset_at - now
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                now = time.monotonic()
+                request = self._queue[0]
+                wait = max(
+                    self._backoff_until - now,
+                    self._daily_wait(now),
+                    self._requests.wait_time(1, now),
+                    self._tokens.wait_time(request.tokens, now)
+                )
+                if wait > 0:
+                    # Wake early if something new (maybe higher priority) arrives.
+                    self._cond.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._queue)
+                self._requests.consume(1, now)
+                self._tokens.consume(request.tokens, now)
+                if self._daily_remaining is not None:
+                    self._daily_remaining -= 1
+
+            self._slots.acquire()
+            self._workers.submit(self._run, request)
+
+    def _run(self, request):
+        try:
+            result, headers, tokens_used = request.fn()
+        except RateLimitExceeded as e:
+            self._on_rate_limited(e)
+            if request.attempts + 1 < self.max_attempts:
+                request.attempts += 1
+                with self._cond:
+                    self._counters["retried"] += 1
+                    heapq.heappush(self._queue, request)
+                    self._cond.notify()
+            else:
+                self._fail(request, e)
+        except Exception as e:
+            self._fail(request, e)
+        else:
+            self._on_success(headers, tokens_used, request.tokens)
+            request.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _fail(self, request, error):
+        with self._cond:
+            self._counters["failed"] += 1
+        request.future.set_exception(error)
+
+    def _observe_headers(self, headers, now):
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_requests is not None:
+            self._daily_wait(now)
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            # Responses of requests dispatched earlier may report more than we
+            # have already counted down, so only ever lower the count.
+            if self._daily_remaining is None:
+                self._daily_remaining = float(remaining_requests)
+            else:
+                self._daily_remaining = min(self._daily_remaining, float(remaining_requests))
+            if reset is not None:
+                self._daily_reset_at = now + reset
+        if remaining_tokens is not None:
+            self._tokens.observe_remaining(float(remaining_tokens), now)
+
+    def _on_success(self, headers, tokens_used, estimated_tokens):
+        with self._cond:
+            now = time.monotonic()
+            self._consecutive_limits = 0
+            self._counters["completed"] += 1
+            if tokens_used is not None:
+                self._tokens.consume(tokens_used - estimated_tokens, now)
+            self._observe_headers(headers or {}, now)
+            self._cond.notify()
+
+    def _on_rate_limited(self, error):
+        with self._cond:
+            now = time.monotonic()
+            self._consecutive_limits += 1
+            self._counters["rate_limited"] += 1
+            self._observe_headers(error.headers, now)
+            delay = error.retry_after
+            if delay is None:
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_limits - 1))
+                delay *= random.uniform(0.5, 1.0)
+            self._backoff_until = max(self._backoff_until, now + delay)
+            print(f"[LLMScheduler] Rate limited, holding requests for {delay:.1f}s")
+            self._cond.notify()
@@ -0,0 +1,116 @@
+"""
+Shared client for calling FactCheckTools MCP tools from the A2A agents.
+
+Each agent owns one MCPClient, which keeps a pooled keep-alive aiohttp
+session for its whole lifetime. Because aiohttp sessions are bound to the
+event loop that created them, agents run their async handlers on one
+long-lived AgentLoop instead of a fresh ``asyncio.run`` per message.
+"""
+import asyncio
+import json
+import random
+import threading
+
+import aiohttp
+
+from tracing import Tracer
+
+
+class MCPToolError(Exception):
+    """Raised when an MCP tool call fails after all retries."""
+
+
+class AgentLoop:
+    """An event loop running in a daemon thread for the lifetime of an agent."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coro):
+        """Run a coroutine on the agent loop and block the calling thread until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+class MCPClient:
+    """Pooled HTTP client for the MCP server with timeouts and jittered retries."""
+
+    def __init__(self, base_url, name="MCPClient", connect_timeout=5, read_timeout=120,
+                 retries=2, backoff=0.5, pool_size=20):
+        self.base_url = base_url.rstrip("/")
+        self.name = name
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.tracer = Tracer.from_env(name)
+        self._session = None
+
+    @classmethod
+    def from_config(cls, config, name):
+        mcp_host = config.get("mcp_host", "localhost")
+        mcp_port = config.get("mcp_port", 8000)
+        return cls(
+            f"http://{mcp_host}:{mcp_port}",
+            name=name,
+            connect_timeout=config.get("mcp_connect_timeout", 5),
+            read_timeout=config.get("mcp_read_timeout", 120),
+            retries=config.get("mcp_retries", 2),
+            pool_size=config.get("mcp_pool_size", 20)
+        )
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def call_tool(self, tool_name, **kwargs):
+        """Call an MCP tool and return the text items of its response, in order."""
+        url = f"{self.base_url}/tools/{tool_name}"
+        print(f"[{self.name}] Calling MCP tool {tool_name}")
+
+        # Joins the trace of the message being handled, so server-side work shows up per tool.
+        with self.tracer.span(f"mcp.{tool_name}", request_bytes=len(json.dumps(kwargs).encode())) as span:
+            for attempt in range(self.retries + 1):
+                span.set(attempts=attempt + 1)
+                try:
+                    async with self._get_session().post(url, json=kwargs) as response:
+                        if response.status == 200:
+                            body = await response.read()
+                            span.set(response_bytes=len(body))
+                            return self._decode(tool_name, json.loads(body))
+                        error = f"{response.status} - {await response.text()}"
+                        if response.status < 500:
+                            raise MCPToolError(f"MCP tool {tool_name} failed: {error}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = f"{type(e).__name__}: {e}"
+
+                if attempt < self.retries:
+                    # Full jitter keeps agents that failed together from retrying in lockstep.
+                    delay = random.uniform(0, self.backoff * 2 ** attempt)
+                    print(f"[{self.name}] MCP tool {tool_name} attempt {attempt + 1} failed ({error}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+            raise MCPToolError(f"MCP tool {tool_name} failed after {self.retries + 1} attempts: {error}")
+
+    async def call_tool_json(self, tool_name, **kwargs):
+        """Call a tool that returns one JSON document (e.g. a dict) and decode it."""
+        texts = await self.call_tool(tool_name, **kwargs)
+        if len(texts) != 1:
+            raise MCPToolError(f"MCP tool {tool_name} returned {len(texts)} items, expected one JSON document")
+        try:
+            return json.loads(texts[0])
+        except json.JSONDecodeError as e:
+            raise MCPToolError(f"MCP tool {tool_name} returned invalid JSON: {e}") from e
+
+    def _decode(self, tool_name, result):
+        texts = [item.get("text", "") for item in result.get("content", []) if item.get("type") == "text"]
+        if result.get("isError"):
+            raise MCPToolError(texts[0] if texts else f"MCP tool {tool_name} reported an error")
+        return texts
@@ -1,17 +1,109 @@
 from python_a2a.mcp import FastMCP
 from dotenv import load_dotenv
 from groq import Groq
+import groq
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
 import requests
+import asyncio
+import hashlib
 import logging
+import yaml
 import json
 import os
 import re
-import datetime
+from tool_cache import ToolCache
+from wikidata_index import WikidataIndex
+from site_builder import BuildCoordinator
+from post_store import PostStore, normalize_claim, post_key
+from site_renderer import SiteRenderer
+from llm_scheduler import LLMScheduler, RateLimitExceeded, parse_duration, PRIORITY_INTERACTIVE, PRIORITY_BATCH
 
 # Load environment variables
 load_dotenv()
 
+# Verdicts keyed by normalized claim; optionally persisted with VERDICT_CACHE_PATH.
+verdict_cache = ToolCache(
+    "check_wikidata",
+    max_entries=int(os.getenv("VERDICT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("VERDICT_CACHE_TTL", str(7 * 24 * 3600))),
+    path=os.getenv("VERDICT_CACHE_PATH") or None,
+    max_disk_entries=int(os.getenv("VERDICT_CACHE_DISK_SIZE", "100000"))
+)
+
+# Claim lists keyed by a hash of the normalized article text, model and prompt version.
+extraction_cache = ToolCache(
+    "extract_claims",
+    max_entries=int(os.getenv("EXTRACTION_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("EXTRACTION_CACHE_TTL", "0")),
+    path=os.getenv("EXTRACTION_CACHE_PATH") or None,
+    max_disk_entries=int(os.getenv("EXTRACTION_CACHE_DISK_SIZE", "100000"))
+)
+
+EXTRACTION_MODEL = "llama3-8b-8192"
+# Prompt tokens per batched extraction request, leaving room in the 8192 context for the answer.
+EXTRACTION_BATCH_TOKENS = int(os.getenv("EXTRACTION_BATCH_TOKENS", "4000"))
+# Completion tokens assumed per request until the response reports real usage.
+EXTRACTION_OUTPUT_TOKENS = 512
+
+# One long-lived Groq client; the scheduler owns retries, so the SDK's own are off.
+# GROQ_BASE_URL (read by the SDK) can point it at a local fake server.
+groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0) if os.getenv("GROQ_API_KEY") else None
+llm_scheduler = LLMScheduler(
+    requests_per_minute=float(os.getenv("GROQ_RPM", "30")),
+    tokens_per_minute=float(os.getenv("GROQ_TPM", "6000")),
+    max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", "4")),
+    burst_seconds=float(os.getenv("GROQ_BURST_SECONDS", "10"))
+)
+
+# Longer articles are split into overlapping chunks that are extracted in parallel.
+EXTRACTION_CHUNK_TOKENS = int(os.getenv("EXTRACTION_CHUNK_TOKENS", "3000"))
+EXTRACTION_CHUNK_OVERLAP = int(os.getenv("EXTRACTION_CHUNK_OVERLAP", "150"))
+extraction_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("EXTRACTION_WORKERS", "4")),
+    thread_name_prefix="extract"
+)
+# Bump whenever the extraction prompt changes so stale cached claims are not reused.
+EXTRACTION_PROMPT_VERSION = 1
+
+# One pooled keep-alive session for all Wikidata lookups. 429 and 5xx answers
+# are retried with exponential backoff, honouring Retry-After.
+WIKIDATA_WORKERS = int(os.getenv("WIKIDATA_WORKERS", "16"))
+WIKIDATA_TIMEOUT = (
+    float(os.getenv("WIKIDATA_CONNECT_TIMEOUT", "3")),
+    float(os.getenv("WIKIDATA_READ_TIMEOUT", "10"))
+)
+wikidata_session = requests.Session()
+wikidata_session.headers["User-Agent"] = "FactCheckingNewsAggregator/0.1 (fact-check MCP server)"
+wikidata_session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=WIKIDATA_WORKERS,
+    pool_block=True,
+    max_retries=Retry(
+        total=int(os.getenv("WIKIDATA_RETRIES", "3")),
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True
+    )
+))
+# Optional offline label index (see wikidata_index.py); the remote API is only used on misses.
+wikidata_index = WikidataIndex(os.environ["WIKIDATA_INDEX_PATH"]) if os.getenv("WIKIDATA_INDEX_PATH") else None
+
+# Blocking lookups run here so the MCP event loop keeps serving other calls.
+wikidata_executor = ThreadPoolExecutor(max_workers=WIKIDATA_WORKERS, thread_name_prefix="wikidata")
+
+# Site builds are coalesced: publishing only writes the post, and one build
+# runs once publishing has been quiet for the debounce window. The default
+# in-process renderer only re-renders pages affected by the new posts;
+# SITE_RENDERER=jekyll runs `jekyll build` instead.
+SITE_RENDERER = os.getenv("SITE_RENDERER", "python")
+JEKYLL_INCREMENTAL = os.getenv("JEKYLL_INCREMENTAL", "1") == "1"
+JEKYLL_BUILD_DEBOUNCE = float(os.getenv("JEKYLL_BUILD_DEBOUNCE", "2"))
+JEKYLL_BUILD_MAX_DELAY = float(os.getenv("JEKYLL_BUILD_MAX_DELAY", "30"))
+
 # Initialize MCP Server
 factcheck_mcp = FastMCP(
     name="FactCheckTools",
@@ -19,17 +111,50 @@ factcheck_mcp = FastMCP(
     description="MCP for verifying factual claims and generating Jekyll posts."
 )
 
-@factcheck_mcp.tool()
-def extract_claims(text: str) -> list:
-    """
-    Extracts standalone factual claims using LLaMA-3 (Groq).
-    """
-    print("[extract_claims] Received input:", text)
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        return ["GROQ_API_KEY not found in environment"]
+def extraction_cache_key(text):
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{EXTRACTION_MODEL}\0{EXTRACTION_PROMPT_VERSION}\0{normalized}".encode()).hexdigest()
 
-    client = Groq(api_key=api_key)
+def _groq_request(system_prompt, prompt):
+    """One chat completion; returns (text or None, rate-limit headers, tokens used)."""
+    try:
+        raw = groq_client.chat.completions.with_raw_response.create(
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2
+        )
+    except groq.APIStatusError as e:
+        if e.status_code in (429, 503):
+            raise RateLimitExceeded(
+                str(e),
+                retry_after=parse_duration(e.response.headers.get("retry-after")),
+                headers=e.response.headers
+            ) from e
+        raise
+    response = raw.parse()
+    output = response.choices[0].message.content
+    tokens_used = response.usage.total_tokens if response.usage else None
+    return (output.strip() if output is not None else None), raw.headers, tokens_used
+
+def _llm_complete(system_prompt, prompt, priority=PRIORITY_INTERACTIVE):
+    """Run one chat completion through the rate-limit scheduler; None if the LLM sent nothing."""
+    estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt) + EXTRACTION_OUTPUT_TOKENS
+    return llm_scheduler.run(lambda: _groq_request(system_prompt, prompt), estimated_tokens, priority)
+
+def _parse_json_output(output, pattern):
+    # Models sometimes wrap the JSON in prose; take the outermost match if there is one.
+    json_match = re.search(pattern, output, re.DOTALL)
+    return json.loads(json_match.group(0) if json_match else output)
+
+def estimate_tokens(text):
+    """Cheap token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+def _extract_claims_text(text, priority=PRIORITY_INTERACTIVE):
+    """Extract claims from one piece of text with one LLM request; None if the LLM sent nothing."""
     prompt = f"""
     Extract a list of concise, standalone factual claims from the following article. 
     Return ONLY the claims in JSON array format, nothing else.
@@ -41,87 +166,412 @@ def extract_claims(text: str) -> list:
     
     Return format: ["claim1", "claim2", "claim3"]
     """
+    output = _llm_complete(
+        "You are a helpful assistant trained to extract factual claims from news articles. Return ONLY JSON arrays, no other text.",
+        prompt,
+        priority
+    )
+    if output is None:
+        return None
+    print("[extract_claims] Raw output from LLM:", output)
 
-    try:
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant trained to extract factual claims from news articles. Return ONLY JSON arrays, no other text."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
-        )
+    return _parse_json_output(output, r'\[.*\]')
 
-        output = response.choices[0].message.content
-        if output is None:
-            return ["No response from LLM"]
-        output = output.strip()
-        print("[extract_claims] Raw output from LLM:", output)
-        
-        # Try to extract JSON array from the response
-        # Look for JSON array pattern
-        json_match = re.search(r'\[.*\]', output, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            return json.loads(json_str)
-        else:
-            # If no JSON array found, try to parse the entire output
-            return json.loads(output)
+def _split_units(text, max_tokens):
+    """Yield paragraphs, falling back to sentences and then words for oversized ones."""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                yield sentence
+                continue
+            words = sentence.split()
+            step = max(1, max_tokens * 4 // 6)  # about six characters per word incl. space
+            for start in range(0, len(words), step):
+                yield " ".join(words[start:start + step])
+
+def _trailing_sentences(text, max_tokens):
+    """The last whole sentences of ``text`` that fit in ``max_tokens``."""
+    tail, used = [], 0
+    for sentence in reversed(re.split(r"(?<=[.!?])\s+", text)):
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        tail.insert(0, sentence)
+        used += cost
+    return " ".join(tail)
+
+def chunk_text(text, max_tokens=EXTRACTION_CHUNK_TOKENS, overlap_tokens=EXTRACTION_CHUNK_OVERLAP):
+    """
+    Split text into chunks of at most ``max_tokens`` estimated tokens on
+    paragraph and sentence boundaries. Each chunk repeats up to
+    ``overlap_tokens`` of trailing context from the previous one so claims
+    spanning a boundary are not lost.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current, used = [], [], 0
+    for unit in _split_units(text, max_tokens):
+        cost = estimate_tokens(unit)
+        if current and used + cost > max_tokens:
+            chunks.append("\n\n".join(current))
+            overlap = _trailing_sentences(current[-1], min(overlap_tokens, max_tokens - cost))
+            current = [overlap] if overlap else []
+            used = estimate_tokens(overlap) if overlap else 0
+        current.append(unit)
+        used += cost
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def merge_claims(claim_lists):
+    """Concatenate claim lists in order, dropping duplicates from overlapping chunks."""
+    merged, seen = [], set()
+    for claims in claim_lists:
+        for claim in claims:
+            key = normalize_claim(claim) if isinstance(claim, str) else json.dumps(claim, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                merged.append(claim)
+    return merged
+
+def _extract_claims_single(text, priority=PRIORITY_INTERACTIVE):
+    """
+    Extract claims from one article, chunking it and extracting the chunks
+    in parallel when it is too long for one request. Returns None if the
+    LLM sent nothing. Only complete results are cached: when some chunks
+    fail, the claims of the others are returned but not cached, so the
+    next call retries the whole article.
+    """
+    chunks = chunk_text(text)
+    complete = True
+    if len(chunks) == 1:
+        claims = _extract_claims_text(text, priority)
+    else:
+        print(f"[extract_claims] Splitting {estimate_tokens(text)} tokens into {len(chunks)} chunks")
 
+        def extract_chunk(chunk):
+            try:
+                return _extract_claims_text(chunk, priority)
+            except Exception as e:
+                return e
+
+        results = list(extraction_executor.map(extract_chunk, chunks))
+        claim_lists = [result for result in results if isinstance(result, list)]
+        if not claim_lists:
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                raise errors[0]
+            return results[0]
+        if len(claim_lists) < len(chunks):
+            complete = False
+            print(f"[extract_claims] {len(chunks) - len(claim_lists)} of {len(chunks)} chunks failed, not caching")
+        claims = merge_claims(claim_lists)
+
+    if complete and isinstance(claims, list):
+        extraction_cache.set(extraction_cache_key(text), claims)
+    return claims
+
+@factcheck_mcp.tool()
+async def extract_claims(text: str) -> list:
+    """
+    Extracts standalone factual claims using LLaMA-3 (Groq).
+    """
+    # Waiting on the rate-limit scheduler must not block the MCP event loop.
+    return await asyncio.get_running_loop().run_in_executor(None, _extract_claims, text)
+
+def _extract_claims(text):
+    print("[extract_claims] Received input:", text)
+    cached = extraction_cache.get(extraction_cache_key(text))
+    if cached is not None:
+        print(f"[extract_claims] Cache hit, {len(cached)} claims")
+        return cached
+
+    if groq_client is None:
+        return ["GROQ_API_KEY not found in environment"]
+
+    try:
+        claims = _extract_claims_single(text)
+        return claims if claims is not None else ["No response from LLM"]
     except Exception as e:
         print("[extract_claims] ERROR:", str(e))
         return [f"Error parsing claims: {str(e)}"]
 
+def pack_by_token_budget(articles, budget):
+    """
+    Group (id, text) pairs in order so each group's estimated prompt size
+    stays within ``budget`` tokens. An article larger than the budget is
+    sent on its own.
+    """
+    groups, current, used = [], [], 0
+    for article_id, text in articles:
+        # Delimiters and the id line cost a few tokens per article.
+        cost = estimate_tokens(text) + 16
+        if current and used + cost > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append((article_id, text))
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+def _extract_claims_group(group):
+    """Extract claims for several articles with one LLM request; returns {id: claims}."""
+    sections = "\n\n".join(f'Article id: {article_id}\n"""\n{text}\n"""' for article_id, text in group)
+    prompt = f"""
+    Extract a list of concise, standalone factual claims from each of the following articles.
+    Return ONLY a JSON object mapping every article id to the JSON array of its claims, nothing else.
+
+    {sections}
+
+    Return format: {{"<article id>": ["claim1", "claim2"], "<article id>": []}}
+    """
+    output = _llm_complete(
+        "You are a helpful assistant trained to extract factual claims from news articles. Return ONLY JSON objects, no other text.",
+        prompt,
+        PRIORITY_BATCH
+    )
+    if output is None:
+        raise ValueError("No response from LLM")
+    print(f"[extract_claims_batch] Raw output from LLM for {len(group)} articles:", output)
+    parsed = _parse_json_output(output, r'\{.*\}')
+    if not isinstance(parsed, dict):
+        raise ValueError("LLM did not return a JSON object")
+    return {str(key): value for key, value in parsed.items()}
+
+@factcheck_mcp.tool()
+async def extract_claims_batch(articles: list) -> dict:
+    """
+    Extracts claims from many articles, packing several articles into each
+    LLM request up to EXTRACTION_BATCH_TOKENS prompt tokens.
+    Each article is an object with id and text. Returns {"claims": {id: [...]}, "errors": {id: "..."}}.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, _extract_claims_batch, articles)
+
+def _extract_claims_batch(articles):
+    print(f"[extract_claims_batch] Received {len(articles)} articles")
+    claims, errors, pending = {}, {}, []
+    for article in articles:
+        article_id, text = str(article["id"]), article["text"]
+        cached = extraction_cache.get(extraction_cache_key(text))
+        if cached is not None:
+            claims[article_id] = cached
+        else:
+            pending.append((article_id, text))
+
+    if pending and groq_client is None:
+        return {"claims": claims, "errors": {article_id: "GROQ_API_KEY not found in environment" for article_id, _ in pending}}
+
+    for group in pack_by_token_budget(pending, EXTRACTION_BATCH_TOKENS):
+        try:
+            group_claims = _extract_claims_group(group) if len(group) > 1 else {}
+        except Exception as e:
+            print("[extract_claims_batch] ERROR:", str(e))
+            group_claims = {}
+
+        for article_id, text in group:
+            article_claims = group_claims.get(article_id)
+            if isinstance(article_claims, list):
+                extraction_cache.set(extraction_cache_key(text), article_claims)
+                claims[article_id] = article_claims
+                continue
+
+            # Missing from the batched answer (or a single article): ask for it alone.
+            try:
+                article_claims = _extract_claims_single(text, PRIORITY_BATCH)
+            except Exception as e:
+                errors[article_id] = f"Error parsing claims: {str(e)}"
+                continue
+            if isinstance(article_claims, list):
+                claims[article_id] = article_claims
+            else:
+                errors[article_id] = "No response from LLM" if article_claims is None else "LLM did not return a JSON array"
+
+    return {"claims": claims, "errors": errors}
+
+def _check_wikidata(statement):
+    key = normalize_claim(statement)
+    cached = verdict_cache.get(key)
+    if cached is not None:
+        return cached
+    result = _search_wikidata(statement)
+    verdict_cache.set(key, result)
+    return result
+
+def _search_wikidata(statement):
+    if wikidata_index is not None:
+        qid = wikidata_index.resolve(statement)
+        if qid:
+            return {"verified": True, "source": f"https://www.wikidata.org/wiki/{qid}"}
+
+    resp = wikidata_session.get("https://www.wikidata.org/w/api.php", params={
+        "action": "wbsearchentities",
+        "search": statement,
+        "language": "en",
+        "format": "json"
+    }, timeout=WIKIDATA_TIMEOUT)
+    resp.raise_for_status()
+
+    data = resp.json()
+    results = data.get("search", [])
+    if results:
+        source_url = f"https://www.wikidata.org/wiki/{results[0]['id']}"
+        return {"verified": True, "source": source_url}
+
+    return {"verified": False, "source": ""}
+
+async def _check_wikidata_async(statement):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(wikidata_executor, _check_wikidata, statement)
+
 @factcheck_mcp.tool()
-def check_wikidata(statement: str) -> dict:
+async def check_wikidata(statement: str) -> dict:
     """
     Checks if a statement is supported by Wikidata.
     """
     print("[check_wikidata] Checking:", statement)
     try:
-        resp = requests.get("https://www.wikidata.org/w/api.php", params={
-            "action": "wbsearchentities",
-            "search": statement,
-            "language": "en",
-            "format": "json"
-        })
-
-        data = resp.json()
-        results = data.get("search", [])
-        if results:
-            source_url = f"https://www.wikidata.org/wiki/{results[0]['id']}"
-            return {"verified": True, "source": source_url}
-
-        return {"verified": False, "source": ""}
+        return await _check_wikidata_async(statement)
     except Exception as e:
         print("[check_wikidata] ERROR:", str(e))
         return {"error": str(e)}
 
+@factcheck_mcp.tool()
+async def check_wikidata_batch(statements: list) -> list:
+    """
+    Checks many statements against Wikidata in one call.
+    Returns one result per statement, in order; failures are reported per item.
+    """
+    print(f"[check_wikidata_batch] Checking {len(statements)} statements")
+    results = await asyncio.gather(
+        *(_check_wikidata_async(str(statement)) for statement in statements),
+        return_exceptions=True
+    )
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            print("[check_wikidata_batch] ERROR:", str(result))
+            results[i] = {"error": str(result)}
+    return results
+
+POSTS_DIR = "jekyll_site/_posts"
+# Posts are written atomically, and a manifest maps each claim key to its post (see post_store.py).
+post_store = PostStore(POSTS_DIR, os.getenv("POST_MANIFEST_PATH", "post_manifest.db"), key_fn=post_key)
+
+with open("jekyll_site/_config.yml") as f:
+    site_config = yaml.safe_load(f)
+site_renderer = SiteRenderer(
+    post_store,
+    "jekyll_site/_site",
+    os.getenv("RENDER_STATE_PATH", "render_state.db"),
+    site_title=site_config.get("title", ""),
+    site_description=site_config.get("description", ""),
+    index_size=int(os.getenv("SITE_INDEX_SIZE", "50")),
+    page_size=int(os.getenv("SITE_PAGE_SIZE", "50"))
+)
+
+def _write_posts(posts):
+    """Write posts (statement, verified, source) in one batch; returns (filename, changed) or an exception per post."""
+    return post_store.write_many([
+        (post_key(statement), statement, verified, source) for statement, verified, source in posts
+    ])
+
+def _build_site(posts):
+    if SITE_RENDERER == "python":
+        return site_renderer.render(posts)
+    command = ["jekyll", "build"]
+    if JEKYLL_INCREMENTAL:
+        command.append("--incremental")
+    return subprocess.run(command, cwd="jekyll_site").returncode
+
 @factcheck_mcp.tool()
 def generate_jekyll_post(statement: str, verified: bool, source: str) -> str:
     """
     Generates a Markdown blog post for a fact-check result.
+    The site build is queued and coalesced with other posts (see build_status).
     """
-    today = datetime.date.today().strftime('%Y-%m-%d')
-    fname = f"{today}-{int(abs(hash(statement)))}.md"
-    content = f"""---
-title: \"Claim {fname}\"
-verified: {verified}
-source: \"{source}\"
----
-
-{statement}
-"""
-    filepath = os.path.join("jekyll_site/_posts", fname)
     try:
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w") as f:
-            f.write(content)
-        return_code = subprocess.run(["jekyll", "build"], cwd="jekyll_site").returncode
-        return f"Generated Jekyll post with code {return_code}"
+        result = _write_posts([(statement, verified, source)])[0]
+        if isinstance(result, Exception):
+            raise result
+        fname, changed = result
+        if not changed:
+            return f"Generated Jekyll post {fname}, unchanged"
+        build_id = site_builds.request(fname)
+        return f"Generated Jekyll post {fname}, queued for build {build_id}"
     except Exception as e:
         return f"Error generating Jekyll post: {str(e)}"
 
+@factcheck_mcp.tool()
+def generate_jekyll_posts(posts: list) -> dict:
+    """
+    Generates Markdown blog posts for many fact-check results; they are built together in one queued site build.
+    Each post is an object with statement, verified and source; results are per post, in order.
+    """
+    print(f"[generate_jekyll_posts] Writing {len(posts)} posts")
+    results, valid = [None] * len(posts), []
+    for i, post in enumerate(posts):
+        try:
+            valid.append((i, (post["statement"], post["verified"], post.get("source", ""))))
+        except (KeyError, TypeError) as e:
+            results[i] = {"error": f"Error generating Jekyll post: invalid post {str(e)}"}
+
+    try:
+        written = _write_posts([post for _, post in valid])
+    except Exception as e:
+        written = [e] * len(valid)
+    for (i, _), result in zip(valid, written):
+        if isinstance(result, Exception):
+            results[i] = {"error": f"Error generating Jekyll post: {str(result)}"}
+        else:
+            results[i] = {"file": result[0], "changed": result[1]}
+
+    build_id = None
+    for result in results:
+        if result.get("changed"):
+            build_id = site_builds.request(result["file"])
+    return {"posts": results, "build_id": build_id}
+
+@factcheck_mcp.tool()
+def build_status() -> dict:
+    """
+    Returns the state of the site build queue (idle, pending or building) and the outcome of the last build.
+    """
+    return site_builds.status()
+
+@factcheck_mcp.tool()
+async def build_site(wait: bool = False) -> dict:
+    """
+    Builds pending posts now instead of after the debounce window.
+    With wait, returns once that build has finished; returns the last build's outcome.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, site_builds.flush, wait, JEKYLL_BUILD_MAX_DELAY + 600)
+
+@factcheck_mcp.tool()
+def cache_stats() -> dict:
+    """
+    Returns hit/miss counters for the MCP server's result caches.
+    """
+    return {"verdicts": verdict_cache.stats(), "extractions": extraction_cache.stats()}
+
+@factcheck_mcp.tool()
+def llm_scheduler_stats() -> dict:
+    """
+    Returns queue depth, rate-limit budget and retry counters of the LLM request scheduler.
+    """
+    return llm_scheduler.stats()
+
+site_builds = BuildCoordinator(_build_site, debounce=JEKYLL_BUILD_DEBOUNCE, max_delay=JEKYLL_BUILD_MAX_DELAY)
+# Posts first indexed at startup (e.g. older posts in _posts) are not on the site yet.
+for fname in post_store.imported:
+    site_builds.request(fname)
+
 # Run the MCP Server
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -1,19 +1,84 @@
 import asyncio
 from python_a2a import A2AServer, A2AClient, Message, TextContent, MessageRole, run_server
+import argparse
+import collections
+import contextvars
+import datetime
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+import re
 import os
+import uuid
+
+from payloads import PayloadError, decode, encode, is_envelope
+from tracing import Tracer, breakdown, format_breakdown, read_spans, trace_id_for
+
+# Queue marker telling a stage worker that no more items will arrive.
+_END = object()
+
+# The job (if any) the running pipeline reports its progress to.
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+# Finished jobs kept for status queries; older ones are forgotten.
+MAX_JOBS = 100
+
+def _iso(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+def _count_items(text, kind):
+    """Number of items in an envelope of ``kind``, or None if the text is not one."""
+    if not is_envelope(text):
+        return None
+    try:
+        return len(decode(text, kind))
+    except PayloadError:
+        return None
 
 class FactCheckOrchestrator(A2AServer):
     """Orchestrates crawler → extractor → checker → publisher pipeline."""
 
-    def __init__(self):
+    def __init__(self, streaming=False, queue_size=8, workers=2, interval=0, jitter=0, overrun="coalesce"):
         super().__init__()
 
+        # Streaming mode moves each article through bounded per-stage queues
+        # instead of handing one text blob from stage to stage.
+        self.streaming = streaming
+        self.queue_size = queue_size
+        self.workers = workers
+
         # Define clients for the agent chain
         self.crawler = A2AClient("http://localhost:5001/a2a")
         self.extractor = A2AClient("http://localhost:5002/a2a")
         self.checker = A2AClient("http://localhost:5003/a2a")
         self.publisher = A2AClient("http://localhost:5004/a2a")
 
+        # Only one pipeline run at a time, whether started by a message or the schedule.
+        self._run_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self.status = {"running": None, "last_run": None, "runs": 0, "skipped": 0, "next_run_at": None}
+
+        # Scheduled mode: run every ``interval`` seconds plus up to ``jitter``
+        # seconds, so several deployments do not hit the feeds in lockstep.
+        self.interval = interval
+        self.jitter = jitter
+        self.overrun = overrun
+        self._stop = threading.Event()
+        if interval > 0:
+            threading.Thread(target=self._schedule_loop, name="pipeline-schedule", daemon=True).start()
+
+        # Submitted jobs run one after another on a worker thread; clients poll them by id.
+        self._jobs = collections.OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._job_queue = queue.Queue()
+        threading.Thread(target=self._job_loop, name="pipeline-jobs", daemon=True).start()
+
+        # Every run is one trace, keyed by the conversation id all stage messages carry.
+        self.tracer = Tracer.from_env("Orchestrator")
+
     def handle_message(self, message):
         """Synchronous handler that calls the async handler."""
         print("[Orchestrator] handle_message called (sync)")
@@ -24,15 +89,223 @@ class FactCheckOrchestrator(A2AServer):
         if message.content.type == "text":
             text = message.content.text.strip().lower()
             if text in ["start", "run", "pipeline", "run pipeline"]:
-                return await self._run_pipeline(message)
+                response = await self._run_exclusive(message, trigger="message")
+                if response is None:
+                    return Message(
+                        content=TextContent(text="⏳ A pipeline run is already in progress. Send `status` to follow it."),
+                        role=MessageRole.AGENT,
+                        parent_message_id=message.message_id,
+                        conversation_id=message.conversation_id
+                    )
+                return response
+            if text == "submit":
+                job = self.submit_job()
+                return Message(
+                    content=TextContent(text=json.dumps({"job_id": job["id"], "state": job["state"]})),
+                    role=MessageRole.AGENT,
+                    parent_message_id=message.message_id,
+                    conversation_id=message.conversation_id
+                )
+            if text == "jobs" or text.startswith("job "):
+                if text == "jobs":
+                    reply = self.list_jobs()
+                else:
+                    reply = self.get_job(text[len("job "):].strip()) or {"error": "Unknown job id"}
+                return Message(
+                    content=TextContent(text=json.dumps(reply, indent=2, ensure_ascii=False)),
+                    role=MessageRole.AGENT,
+                    parent_message_id=message.message_id,
+                    conversation_id=message.conversation_id
+                )
+            if text == "status":
+                return Message(
+                    content=TextContent(text=json.dumps(self.get_status(), indent=2)),
+                    role=MessageRole.AGENT,
+                    parent_message_id=message.message_id,
+                    conversation_id=message.conversation_id
+                )
 
         return Message(
-            content=TextContent(text="Type `start` to run the fact-checking pipeline."),
+            content=TextContent(text=(
+                "Type `start` to run the fact-checking pipeline, `submit` to queue it as a job "
+                "(then `job <id>` or `jobs` to follow it), or `status` for the last run."
+            )),
             role=MessageRole.AGENT,
             parent_message_id=message.message_id,
             conversation_id=message.conversation_id
         )
 
+    def get_status(self):
+        """Current run, last finished run and schedule, with times as ISO strings."""
+        with self._status_lock:
+            status = json.loads(json.dumps(self.status))
+        status["schedule"] = {"interval": self.interval, "jitter": self.jitter, "overrun": self.overrun} if self.interval > 0 else None
+        return status
+
+    async def _run_exclusive(self, message, trigger, wait=False):
+        """
+        Run the pipeline unless a run is already in progress (or, with
+        ``wait``, once it has finished); returns its reply, or None if it was skipped.
+        """
+        if not self._run_lock.acquire(blocking=wait):
+            with self._status_lock:
+                self.status["skipped"] += 1
+            print(f"[Orchestrator] Skipping {trigger} run: a run is already in progress")
+            return None
+        started = time.time()
+        summary = "❌ Run did not finish"
+        if not message.conversation_id:
+            message.conversation_id = str(uuid.uuid4())
+        trace_offset = self._trace_offset()
+        try:
+            with self._status_lock:
+                self.status["running"] = {"trigger": trigger, "started_at": _iso(started)}
+            with self.tracer.span("pipeline", conversation_id=message.conversation_id, trigger=trigger,
+                                  streaming=self.streaming):
+                if self.streaming:
+                    response = await self._run_streaming_pipeline(message)
+                else:
+                    response = await self._run_pipeline(message)
+            rows = breakdown(read_spans(self.tracer.path, trace_id_for(message.conversation_id), trace_offset))
+            if rows and isinstance(response.content, TextContent):
+                response.content.text += "\n\n" + format_breakdown(rows)
+            summary = self._get_text_content(response, "Pipeline")
+            return response
+        finally:
+            finished = time.time()
+            with self._status_lock:
+                self.status["running"] = None
+                self.status["runs"] += 1
+                self.status["last_run"] = {
+                    "trigger": trigger,
+                    "started_at": _iso(started),
+                    "finished_at": _iso(finished),
+                    "duration": round(finished - started, 1),
+                    "ok": not summary.startswith("❌"),
+                    "summary": summary
+                }
+            self._run_lock.release()
+
+    def _trace_offset(self):
+        """Size of the trace file before a run, so reading its spans skips everything older."""
+        try:
+            return os.path.getsize(self.tracer.path) if self.tracer.path else 0
+        except OSError:
+            return 0
+
+    def _schedule_loop(self):
+        print(f"[Orchestrator] Scheduled mode: every {self.interval}s (+ up to {self.jitter}s jitter), overruns {self.overrun}")
+        next_run = time.time() + self.interval + random.uniform(0, self.jitter)
+        while True:
+            with self._status_lock:
+                self.status["next_run_at"] = _iso(next_run)
+            if self._stop.wait(max(0.0, next_run - time.time())):
+                return
+            scheduled_for = next_run
+            try:
+                asyncio.run(self._run_exclusive(
+                    Message(content=TextContent(text="start"), role=MessageRole.USER),
+                    trigger="schedule"
+                ))
+            except Exception as e:
+                print(f"[Orchestrator] Scheduled run failed: {e}")
+            next_run = scheduled_for + self.interval + random.uniform(0, self.jitter)
+            now = time.time()
+            if next_run < now:
+                # The run took longer than the interval; ticks that fell inside it are not queued up.
+                missed = int((now - next_run) // self.interval) + 1
+                if self.overrun == "skip":
+                    next_run += missed * self.interval
+                    with self._status_lock:
+                        self.status["skipped"] += missed
+                    print(f"[Orchestrator] Run overran the interval, skipping {missed} tick(s)")
+                else:
+                    next_run = now
+                    print(f"[Orchestrator] Run overran the interval, coalescing {missed} missed tick(s) into one run")
+
+    def stop_schedule(self):
+        self._stop.set()
+
+    def submit_job(self):
+        """Queue a pipeline run and return its job record right away."""
+        with self._status_lock:
+            job = {
+                "id": str(next(self._job_ids)),
+                "state": "queued",
+                "submitted_at": _iso(time.time()),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {},
+                "events": [],
+                "result": None
+            }
+            self._jobs[job["id"]] = job
+            # Forget the oldest finished jobs; queued and running ones are always kept.
+            finished = [job_id for job_id, old in self._jobs.items() if old["state"] in ("done", "failed")]
+            for job_id in finished[:max(0, len(self._jobs) - MAX_JOBS)]:
+                del self._jobs[job_id]
+        self._job_queue.put(job["id"])
+        print(f"[Orchestrator] Job {job['id']} queued")
+        return job
+
+    def get_job(self, job_id):
+        with self._status_lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def list_jobs(self):
+        with self._status_lock:
+            return [
+                {key: job[key] for key in ("id", "state", "submitted_at", "started_at", "finished_at")}
+                for job in self._jobs.values()
+            ]
+
+    def _job_loop(self):
+        while True:
+            job_id = self._job_queue.get()
+            with self._status_lock:
+                job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            asyncio.run(self._run_job(job))
+
+    async def _run_job(self, job):
+        # Runs queue behind whatever run is in progress rather than being skipped.
+        _current_job.set(job)
+        try:
+            response = await self._run_exclusive(
+                Message(content=TextContent(text="start"), role=MessageRole.USER),
+                trigger=f"job {job['id']}",
+                wait=True
+            )
+            result = self._get_text_content(response, "Pipeline")
+        except Exception as e:
+            result = f"❌ Error in pipeline: {str(e)}"
+        with self._status_lock:
+            job["state"] = "failed" if result.startswith("❌") else "done"
+            job["finished_at"] = _iso(time.time())
+            job["result"] = result
+        print(f"[Orchestrator] Job {job['id']} {job['state']}")
+
+    def _report(self, stage, event, items=None):
+        """Record a stage event (started, finished, item) on the current job, if the run belongs to one."""
+        job = _current_job.get()
+        if job is None:
+            return
+        with self._status_lock:
+            if job["state"] == "queued":
+                job["state"] = "running"
+                job["started_at"] = _iso(time.time())
+            progress = job["progress"].setdefault(stage, {"state": "pending", "done": 0})
+            if event == "item":
+                # Per-item progress only updates the counters, so the event log stays small.
+                progress["done"] += 1
+                return
+            progress["state"] = event
+            if items is not None:
+                progress["items"] = items
+            job["events"].append({"at": _iso(time.time()), "stage": stage, "event": event, "items": items})
+
     def _get_text_content(self, msg, label):
         if isinstance(msg.content, TextContent):
             return msg.content.text
@@ -44,32 +317,25 @@ class FactCheckOrchestrator(A2AServer):
         print("[Orchestrator] _run_pipeline called")
         try:
             # Step 1: Crawl news
-            crawl_resp = await self.crawler.send_message_async(Message(
-                content=TextContent(text="start"),
-                role=MessageRole.USER
-            ))
-            crawl_text = self._get_text_content(crawl_resp, "Crawler")
+            self._report("crawler", "started")
+            crawl_text = await self._call_agent(self.crawler, "start", "Crawler", message.conversation_id)
+            self._report("crawler", "finished", _count_items(crawl_text, "articles"))
 
             # Step 2: Extract factual claims
-            extract_resp = await self.extractor.send_message_async(Message(
-                content=TextContent(text=crawl_text),
-                role=MessageRole.USER
-            ))
-            extract_text = self._get_text_content(extract_resp, "Extractor")
+            self._report("extractor", "started")
+            extract_text = await self._call_agent(self.extractor, crawl_text, "Extractor", message.conversation_id)
+            self._report("extractor", "finished", _count_items(extract_text, "claims"))
 
             # Step 3: Check the claims
-            check_resp = await self.checker.send_message_async(Message(
-                content=TextContent(text=extract_text),
-                role=MessageRole.USER
-            ))
-            check_text = self._get_text_content(check_resp, "Checker")
+            self._report("checker", "started")
+            check_text = await self._call_agent(self.checker, extract_text, "Checker", message.conversation_id)
+            self._report("checker", "finished", _count_items(check_text, "verdicts"))
 
             # Step 4: Publish the validated results
-            publish_resp = await self.publisher.send_message_async(Message(
-                content=TextContent(text=check_text),
-                role=MessageRole.USER
-            ))
-            publish_text = self._get_text_content(publish_resp, "Publisher")
+            self._report("publisher", "started")
+            publish_text = await self._call_agent(self.publisher, check_text, "Publisher", message.conversation_id)
+            published = re.search(r"Published (\d+)", publish_text)
+            self._report("publisher", "finished", int(published.group(1)) if published else None)
 
             print(crawl_text)
             print(extract_text)
@@ -92,5 +358,139 @@ class FactCheckOrchestrator(A2AServer):
                 conversation_id=message.conversation_id
             )
 
+    async def _call_agent(self, client, text, label, conversation_id=None):
+        """Send ``text`` to an agent within the run's conversation, timing the round trip as a span."""
+        with self.tracer.span(label.lower(), request_bytes=len(text.encode())) as span:
+            response = await client.send_message_async(Message(
+                content=TextContent(text=text),
+                role=MessageRole.USER,
+                conversation_id=conversation_id
+            ))
+            response_text = self._get_text_content(response, label)
+            span.set(response_bytes=len(response_text.encode()))
+            return response_text
+
+    async def _run_stage(self, label, handle, inbox, outbox, next_workers, errors):
+        """
+        Run ``self.workers`` workers that take items from ``inbox`` and put what
+        ``handle`` returns (unless None) on ``outbox``. Failures are recorded
+        per item so one bad article does not stop the others.
+        """
+        stage = label.lower()
+        self._report(stage, "started")
+
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _END:
+                    return
+                try:
+                    result = await handle(item)
+                except Exception as e:
+                    print(f"[Orchestrator] {label} failed for one item: {e}")
+                    errors.append(f"{label}: {e}")
+                    continue
+                finally:
+                    self._report(stage, "item")
+                if result is not None and outbox is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        self._report(stage, "finished")
+        if outbox is not None:
+            for _ in range(next_workers):
+                await outbox.put(_END)
+
+    async def _run_streaming_pipeline(self, message):
+        print("[Orchestrator] _run_streaming_pipeline called")
+        started = time.monotonic()
+        try:
+            self._report("crawler", "started")
+            crawl_text = await self._call_agent(self.crawler, "start", "Crawler", message.conversation_id)
+            articles = decode(crawl_text, "articles")
+            self._report("crawler", "finished", len(articles))
+            print(f"[Orchestrator] Streaming {len(articles)} articles through the pipeline")
+
+            extract_q = asyncio.Queue(maxsize=self.queue_size)
+            check_q = asyncio.Queue(maxsize=self.queue_size)
+            publish_q = asyncio.Queue(maxsize=self.queue_size)
+            errors = []
+            stats = {"published": 0, "first_publish": None}
+
+            # Replies are forwarded as-is; decoding only validates them and
+            # drops articles that produced nothing to check or publish.
+            async def extract(article):
+                claims_text = await self._call_agent(self.extractor, encode("articles", [article]), "Extractor", message.conversation_id)
+                return claims_text if decode(claims_text, "claims") else None
+
+            async def check(claims_text):
+                verdicts_text = await self._call_agent(self.checker, claims_text, "Checker", message.conversation_id)
+                return verdicts_text if decode(verdicts_text, "verdicts") else None
+
+            async def publish(verdicts_text):
+                publish_text = await self._call_agent(self.publisher, verdicts_text, "Publisher", message.conversation_id)
+                count = re.search(r"Published (\d+)", publish_text)
+                if count and int(count.group(1)):
+                    stats["published"] += int(count.group(1))
+                    if stats["first_publish"] is None:
+                        stats["first_publish"] = time.monotonic() - started
+                        print(f"[Orchestrator] First claims published after {stats['first_publish']:.2f}s")
+
+            async def feed():
+                for article in articles:
+                    await extract_q.put(article)
+                for _ in range(self.workers):
+                    await extract_q.put(_END)
+
+            await asyncio.gather(
+                feed(),
+                self._run_stage("Extractor", extract, extract_q, check_q, self.workers, errors),
+                self._run_stage("Checker", check, check_q, publish_q, self.workers, errors),
+                self._run_stage("Publisher", publish, publish_q, None, 0, errors)
+            )
+
+            summary = f"✅ Published {stats['published']} claims from {len(articles)} articles in {time.monotonic() - started:.1f}s."
+            if stats["first_publish"] is not None:
+                summary += f" First claims published after {stats['first_publish']:.1f}s."
+            if errors:
+                summary += f"\n{len(errors)} item(s) failed:\n" + "\n".join(errors)
+
+            return Message(
+                content=TextContent(text="✅ Pipeline complete:\n\n" + summary),
+                role=MessageRole.AGENT,
+                parent_message_id=message.message_id,
+                conversation_id=message.conversation_id
+            )
+        except Exception as e:
+            return Message(
+                content=TextContent(text=f"❌ Error in pipeline: {str(e)}"),
+                role=MessageRole.AGENT,
+                parent_message_id=message.message_id,
+                conversation_id=message.conversation_id
+            )
+
 if __name__ == "__main__":
-    run_server(FactCheckOrchestrator(), host="0.0.0.0", port=5005)
+    parser = argparse.ArgumentParser(description="FactCheck Orchestrator")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stream each article through the stages instead of one batch per stage")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="Maximum items waiting between two stages in streaming mode")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Concurrent requests per stage in streaming mode")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Run the pipeline every INTERVAL seconds (0 = only on request)")
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="Add up to JITTER random seconds to every scheduled run")
+    parser.add_argument("--overrun", choices=["coalesce", "skip"], default="coalesce",
+                        help="When a run outlasts the interval: run once right away (coalesce) or wait for the next tick (skip)")
+    args = parser.parse_args()
+
+    orchestrator = FactCheckOrchestrator(
+        streaming=args.streaming,
+        queue_size=args.queue_size,
+        workers=args.workers,
+        interval=args.interval,
+        jitter=args.jitter,
+        overrun=args.overrun
+    )
+    run_server(orchestrator, host="0.0.0.0", port=5005)
@@ -1,10 +1,42 @@
 from python_a2a import A2AClient, Message, TextContent, MessageRole
 import argparse
+import json
+import time
 
-def interactive_session(client):
+def send(client, text):
+    message = Message(
+        content=TextContent(text=text),
+        role=MessageRole.USER
+    )
+    return client.send_message(message).content.text
+
+def follow_jobs(client, job_ids, poll_interval):
+    """Poll jobs with short requests, printing new stage events until all of them have finished."""
+    seen_events = {job_id: 0 for job_id in job_ids}
+    pending = set(job_ids)
+    while pending:
+        for job_id in sorted(pending, key=int):
+            job = json.loads(send(client, f"job {job_id}"))
+            if "error" in job:
+                print(f"❌ Job {job_id}: {job['error']}")
+                pending.discard(job_id)
+                continue
+            for event in job["events"][seen_events[job_id]:]:
+                items = f" ({event['items']} items)" if event.get("items") is not None else ""
+                print(f"[job {job_id}] {event['at']} {event['stage']} {event['event']}{items}")
+            seen_events[job_id] = len(job["events"])
+            if job["state"] in ("done", "failed"):
+                print(f"\n🛰️  Job {job_id} {job['state']}:\n{job['result']}")
+                pending.discard(job_id)
+        if pending:
+            time.sleep(poll_interval)
+
+def interactive_session(client, poll_interval):
     print("\n🧠 FactCheck Pipeline Client")
-    print("Type `start` to begin the pipeline, or `exit` to quit.")
+    print("Type `start` to run the pipeline and wait for it, `submit` to queue it as a job,")
+    print("`follow [job ids]` to follow submitted jobs, `jobs` to list them, or `exit` to quit.")
     print("=" * 50)
+    submitted = []
 
     while True:
         try:
@@ -14,15 +46,25 @@ def interactive_session(client):
                 print("👋 Exiting.")
                 break
 
-            message = Message(
-                content=TextContent(text=user_input),
-                role=MessageRole.USER
-            )
+            if user_input.lower() == "submit":
+                job = json.loads(send(client, "submit"))
+                submitted.append(job["job_id"])
+                print(f"🆔 Job {job['job_id']} {job['state']}")
+                continue
+
+            if user_input.lower().startswith("follow"):
+                job_ids = user_input.split()[1:] or submitted
+                if not job_ids:
+                    print("No jobs to follow; type `submit` first.")
+                    continue
+                follow_jobs(client, job_ids, poll_interval)
+                submitted = [job_id for job_id in submitted if job_id not in job_ids]
+                continue
 
             print("⏳ Sending to orchestrator...")
-            response = client.send_message(message)
+            response = send(client, user_input)
 
-            print(f"\n🛰️  Orchestrator Response:\n{response.content.text}")
+            print(f"\n🛰️  Orchestrator Response:\n{response}")
 
         except Exception as e:
             print(f"❌ Error: {e}\nTry again or type 'exit' to quit.")
@@ -31,7 +73,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="FactCheck Pipeline Client")
     parser.add_argument("--endpoint", default="http://localhost:5005/a2a",
                         help="Orchestrator endpoint URL")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between job status requests when following jobs")
     args = parser.parse_args()
 
     client = A2AClient(args.endpoint)
-    interactive_session(client)
+    interactive_session(client, args.poll_interval)
@@ -0,0 +1,113 @@
+"""
+Versioned, schema-checked payloads exchanged between the pipeline agents.
+
+Every payload is one compact JSON envelope:
+
+    {"v":1,"kind":"claims","items":[{"statement":"...","article_id":"..."}]}
+
+so each agent parses exactly the items it expects instead of digging JSON
+out of prose.
+"""
+from dataclasses import dataclass, asdict, fields, MISSING
+import json
+
+SCHEMA_VERSION = 1
+
+
+class PayloadError(ValueError):
+    """Raised when a message is not a valid envelope of the expected kind."""
+
+
+@dataclass
+class Article:
+    id: str
+    title: str
+    link: str
+    content: str
+    published: str
+    source: str
+
+
+@dataclass
+class Claim:
+    statement: str
+    article_id: str = ""
+
+
+@dataclass
+class Verdict:
+    statement: str
+    verified: bool
+    source: str
+    article_id: str = ""
+    error: str = ""
+
+
+KINDS = {"articles": Article, "claims": Claim, "verdicts": Verdict}
+
+
+def _from_dict(item_type, data):
+    if not isinstance(data, dict):
+        raise PayloadError(f"{item_type.__name__} must be an object, got {type(data).__name__}")
+    values = {}
+    for field in fields(item_type):
+        if field.name not in data:
+            if field.default is MISSING:
+                raise PayloadError(f"{item_type.__name__} is missing '{field.name}'")
+            continue
+        value = data[field.name]
+        if not isinstance(value, field.type):
+            raise PayloadError(
+                f"{item_type.__name__}.{field.name} must be {field.type.__name__}, got {type(value).__name__}"
+            )
+        values[field.name] = value
+    # Unknown keys are ignored so newer senders stay readable.
+    return item_type(**values)
+
+
+def _compact(item):
+    # Optional fields still at their default are not worth sending.
+    defaults = {field.name: field.default for field in fields(item) if field.default is not MISSING}
+    return {key: value for key, value in asdict(item).items() if key not in defaults or value != defaults[key]}
+
+
+def encode(kind, items):
+    """Validate dataclass instances (or plain dicts) and serialise them as a compact envelope."""
+    if kind not in KINDS:
+        raise PayloadError(f"Unknown payload kind: {kind}")
+    item_type = KINDS[kind]
+    payload = [_compact(_from_dict(item_type, item if isinstance(item, dict) else asdict(item))) for item in items]
+    return json.dumps({"v": SCHEMA_VERSION, "kind": kind, "items": payload}, separators=(",", ":"), ensure_ascii=False)
+
+
+def is_envelope(text):
+    """Whether ``text`` is a JSON object with "v" and "kind" keys; anything else is legacy text."""
+    if not text.lstrip().startswith("{"):
+        return False
+    try:
+        envelope = json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(envelope, dict) and "v" in envelope and "kind" in envelope
+
+
+def decode(text, kind):
+    """Parse an envelope and return its items as dataclass instances."""
+    try:
+        envelope = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise PayloadError(f"Payload is not JSON: {e}") from e
+    if not isinstance(envelope, dict):
+        raise PayloadError("Payload is not an envelope object")
+    if envelope.get("v") != SCHEMA_VERSION:
+        raise PayloadError(f"Unsupported payload version: {envelope.get('v')}")
+    if envelope.get("kind") != kind:
+        raise PayloadError(f"Expected '{kind}' payload, got '{envelope.get('kind')}'")
+    return decode_items(envelope.get("items"), kind)
+
+
+def decode_items(items, kind):
+    """Validate a bare list of item dicts, e.g. from a hand-written JSON array."""
+    if not isinstance(items, list):
+        raise PayloadError("Payload 'items' must be a list")
+    return [_from_dict(KINDS[kind], item) for item in items]
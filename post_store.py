@@ -0,0 +1,237 @@
+"""
+Storage layer for published fact-check posts.
+
+Posts are written in batches, each file via a temporary file plus an atomic
+rename, so a crash never leaves half-written Markdown in ``_posts``. A
+SQLite manifest maps each claim key to its filename, verdict, source and
+content hash, so "is this claim published, and did it change?" is one
+indexed lookup rather than a directory scan or a file read.
+"""
+from contextlib import contextmanager
+import datetime
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Temporary files start with a dot so Jekyll never picks them up.
+TEMP_PREFIX = ".tmp-"
+# Any Jekyll post name; posts from before the hashed scheme use other slugs.
+POST_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})-(.+)\.md$")
+
+
+def normalize_claim(statement):
+    """Fold case, punctuation and whitespace so trivially different claims share a key."""
+    return " ".join(re.sub(r"[^\w\s]", "", statement.casefold()).split())
+
+
+def post_key(statement):
+    """Stable post id: a truncated SHA-256 of the normalized statement, the same in every process."""
+    return hashlib.sha256(normalize_claim(statement).encode()).hexdigest()[:16]
+
+
+def render_post(fname, statement, verified, source):
+    return f"""---
+title: \"Claim {fname}\"
+verified: {verified}
+source: \"{source}\"
+---
+
+{statement}
+"""
+
+
+def parse_post(content):
+    """Read (statement, verified, source) back from a rendered post."""
+    _, front_matter, body = content.split("---\n", 2)
+    fields = dict(re.findall(r'^(\w+): "?(.*?)"?$', front_matter, re.MULTILINE))
+    return body.strip(), fields.get("verified") == "True", fields.get("source", "")
+
+
+def write_atomic(path, content):
+    """Write ``content`` to ``path`` via a temporary file in the same directory and an atomic rename."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=directory)
+    try:
+        # mkstemp creates the file private to the owner; posts are served publicly.
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class PostStore:
+    """
+    Writes posts to ``posts_dir`` and keeps the manifest at ``manifest_path``.
+    ``write_many`` takes ``(key, statement, verified, source)`` tuples, where
+    the key is a stable id of the claim, and returns ``(filename, changed)``
+    per post, in order, or the exception that post failed with.
+
+    Posts found in ``posts_dir`` but not in the manifest (written before it
+    existed, or under an older naming scheme) are indexed on startup under
+    ``key_fn(statement)``, so republishing such a claim updates its file.
+    Without ``key_fn`` the key is the slug of the filename.
+    """
+
+    def __init__(self, posts_dir, manifest_path, key_fn=None):
+        self.posts_dir = posts_dir
+        self.manifest_path = manifest_path
+        self.key_fn = key_fn
+        self._lock = threading.Lock()
+        os.makedirs(posts_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+
+        # Leftovers of writes interrupted before their rename.
+        for leftover in glob.glob(os.path.join(posts_dir, TEMP_PREFIX + "*")):
+            os.remove(leftover)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "key TEXT PRIMARY KEY, filename TEXT NOT NULL, statement TEXT NOT NULL, "
+                "verified INTEGER NOT NULL, source TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "published_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS posts_filename ON posts (filename)")
+            conn.execute("CREATE INDEX IF NOT EXISTS posts_published_at ON posts (published_at)")
+        self.imported = self._import_existing()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.manifest_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _import_existing(self):
+        """Index the posts in ``posts_dir`` the manifest does not know yet; returns their filenames."""
+        known = set(self.filenames())
+        rows = []
+        for fname in sorted(os.listdir(self.posts_dir)):
+            match = POST_NAME.match(fname)
+            if not match or fname in known:
+                continue
+            path = os.path.join(self.posts_dir, fname)
+            with open(path) as f:
+                content = f.read()
+            try:
+                statement, verified, source = parse_post(content)
+            except ValueError:
+                print(f"[PostStore] Skipping unreadable post {fname}")
+                continue
+            modified = os.path.getmtime(path)
+            key = self.key_fn(statement) if self.key_fn else match.group(2)
+            rows.append((key, fname, statement, int(verified), source, content_hash(content), modified, modified))
+
+        imported = []
+        if rows:
+            with self._connect() as conn:
+                for row in rows:
+                    # A second file for an already indexed claim is left alone.
+                    if conn.execute("INSERT OR IGNORE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row).rowcount:
+                        imported.append(row[1])
+                    else:
+                        print(f"[PostStore] Not indexing {row[1]}: its claim is already published as another post")
+            print(f"[PostStore] Indexed {len(imported)} existing posts")
+        return imported
+
+    _COLUMNS = "key, filename, statement, verified, source, content_hash, published_at, updated_at"
+
+    @staticmethod
+    def _record(row):
+        return {
+            "key": row[0], "filename": row[1], "statement": row[2], "verified": bool(row[3]),
+            "source": row[4], "content_hash": row[5], "published_at": row[6], "updated_at": row[7]
+        }
+
+    def _query(self, where, params=()):
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {self._COLUMNS} FROM posts {where}", params).fetchall()
+        return [self._record(row) for row in rows]
+
+    def get(self, key):
+        """The manifest entry for a claim key, or None if it was never published."""
+        records = self._query("WHERE key = ?", (key,))
+        return records[0] if records else None
+
+    def by_filenames(self, filenames):
+        records = []
+        filenames = list(filenames)
+        for start in range(0, len(filenames), 500):
+            chunk = filenames[start:start + 500]
+            records.extend(self._query(f"WHERE filename IN ({','.join('?' * len(chunk))})", chunk))
+        return records
+
+    def on_date(self, date):
+        """Posts first published on ``date`` (YYYY-MM-DD), newest first."""
+        # Filenames start with the date ("-" sorts just before "."), so this is a range scan on the filename index.
+        return self._query("WHERE filename >= ? AND filename < ? ORDER BY published_at DESC", (f"{date}-", f"{date}."))
+
+    def latest(self, limit):
+        """The ``limit`` most recently first-published posts."""
+        return self._query("ORDER BY published_at DESC LIMIT ?", (limit,))
+
+    def filenames(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT filename FROM posts")]
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def write_many(self, posts):
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        results, updates = [], []
+        with self._lock:
+            with self._connect() as conn:
+                known = {}
+                keys = list({key for key, _, _, _ in posts})
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    for key, fname, digest, published_at in conn.execute(
+                        f"SELECT key, filename, content_hash, published_at FROM posts WHERE key IN ({placeholders})", chunk
+                    ):
+                        known[key] = (fname, digest, published_at)
+
+            try:
+                for key, statement, verified, source in posts:
+                    # A claim keeps the date of its first publication.
+                    now = time.time()
+                    fname, old_digest, published_at = known.get(key, (f"{today}-{key}.md", None, now))
+                    content = render_post(fname, statement, verified, source)
+                    digest = content_hash(content)
+                    if digest == old_digest and os.path.exists(os.path.join(self.posts_dir, fname)):
+                        results.append((fname, False))
+                        continue
+                    try:
+                        write_atomic(os.path.join(self.posts_dir, fname), content)
+                    except OSError as e:
+                        results.append(e)
+                        continue
+                    known[key] = (fname, digest, published_at)
+                    updates.append((key, fname, statement, int(bool(verified)), source, digest, published_at, now))
+                    results.append((fname, True))
+            finally:
+                # Record whatever reached the disk, even if the batch was interrupted.
+                if updates:
+                    with self._connect() as conn:
+                        conn.executemany("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", updates)
+        return results
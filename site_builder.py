@@ -0,0 +1,122 @@
+"""
+Coalescing build coordinator for the fact-check site.
+
+Publishing a post only records that the site is dirty; a background thread
+runs one build after the publish traffic has been quiet for ``debounce``
+seconds (or at the latest ``max_delay`` seconds after the first pending
+post), so a run that publishes 50 claims triggers one build instead of 50.
+Posts that arrive while a build is running are picked up by the next one.
+"""
+import threading
+import time
+
+
+class BuildCoordinator:
+    """
+    Runs ``build_fn(posts)`` (which returns a process exit code) on a worker
+    thread whenever posts are pending, passing the posts written since the
+    last build so incremental builders can limit their work. ``status()``
+    reports the current state and the last build, so callers never wait on
+    a build.
+    """
+
+    def __init__(self, build_fn, debounce=2.0, max_delay=30.0):
+        self.build_fn = build_fn
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._pending = []
+        self._first_pending_at = None
+        self._last_pending_at = None
+        self._flush = False
+        self._building = False
+        self._build_id = 0          # id of the most recently started build
+        self._completed_id = 0      # id of the most recently finished build
+        self._last_build = None
+        self._thread = threading.Thread(target=self._worker, name="site-builder", daemon=True)
+        self._thread.start()
+
+    def request(self, post=None):
+        """Mark the site dirty (optionally naming the post written) and return the id of the build that will include it."""
+        with self._cond:
+            now = time.monotonic()
+            if post is not None:
+                self._pending.append(post)
+            if self._first_pending_at is None:
+                self._first_pending_at = now
+            self._last_pending_at = now
+            self._cond.notify()
+            return self._build_id + 1
+
+    def flush(self, wait=False, timeout=None):
+        """Build pending posts now instead of waiting for the debounce window; optionally wait for that build."""
+        with self._cond:
+            if self._first_pending_at is None:
+                return self._last_build
+            self._flush = True
+            target = self._build_id + 1
+            self._cond.notify_all()
+            if wait:
+                self._cond.wait_for(lambda: self._completed_id >= target, timeout=timeout)
+            return self._last_build
+
+    def status(self):
+        with self._cond:
+            if self._building:
+                state = "building"
+            elif self._first_pending_at is not None:
+                state = "pending"
+            else:
+                state = "idle"
+            return {
+                "state": state,
+                "pending_posts": len(self._pending),
+                "builds_started": self._build_id,
+                "last_build": self._last_build
+            }
+
+    def _due_in(self, now):
+        if self._flush:
+            return 0.0
+        return min(self._last_pending_at + self.debounce, self._first_pending_at + self.max_delay) - now
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._first_pending_at is None:
+                        self._cond.wait()
+                        continue
+                    wait = self._due_in(time.monotonic())
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                posts, self._pending = self._pending, []
+                self._first_pending_at = self._last_pending_at = None
+                self._flush = False
+                self._building = True
+                self._build_id += 1
+                build_id = self._build_id
+
+            started = time.time()
+            print(f"[BuildCoordinator] Build {build_id} started for {len(posts)} posts")
+            try:
+                return_code = self.build_fn(posts)
+                error = ""
+            except Exception as e:
+                return_code, error = None, str(e)
+            duration = time.time() - started
+            print(f"[BuildCoordinator] Build {build_id} finished with code {return_code} in {duration:.1f}s")
+
+            with self._cond:
+                self._building = False
+                self._completed_id = build_id
+                self._last_build = {
+                    "id": build_id,
+                    "posts": len(posts),
+                    "return_code": return_code,
+                    "error": error,
+                    "started_at": started,
+                    "duration": round(duration, 3)
+                }
+                self._cond.notify_all()
@@ -0,0 +1,307 @@
+"""
+Incremental, in-process renderer for the fact-check site.
+
+Renders the posts recorded in the PostStore manifest straight to HTML in
+the Jekyll output directory, using the same layout and URLs as the Jekyll
+build (``/YYYY/MM/DD/<key>.html``), without Ruby. A dependency map kept in
+SQLite between runs records which posts every page lists and a hash of the
+inputs each page was last rendered from, so publishing a post re-renders
+only its own page and the listing pages it appears on, and a page whose
+inputs did not change is never rewritten.
+
+Listings (all posts, verified, unverified and one per day) are split into
+shard pages of at most ``page_size`` posts, numbered from the oldest post:
+a post keeps its shard for good and new posts only ever land in the newest
+shard, so page size and the work per publish stay bounded however large
+the archive grows.
+"""
+from contextlib import contextmanager
+import hashlib
+import html
+import json
+import os
+import sqlite3
+import time
+
+from post_store import write_atomic
+
+# Bump whenever the templates below change so every page is re-rendered.
+RENDERER_VERSION = 2
+
+LAYOUT = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <title>{title}</title>
+  <link rel="stylesheet" href="/assets/main.css">
+</head>
+<body>
+  <header>
+    <h1><a href="/">{site_title}</a></h1>
+    <p>{site_description}</p>
+    <hr>
+  </header>
+
+  <main>
+    {content}
+  </main>
+
+  <footer>
+    <hr>
+    <p>Powered by <a href="https://jekyllrb.com">Jekyll</a> & Verified by Agents 🕵️</p>
+  </footer>
+</body>
+</html>
+"""
+
+INTRO = (
+    "<p>Welcome to our fact-checked news aggregator! This site contains verified factual claims "
+    "extracted from news articles and fact-checked against reliable sources.</p>"
+)
+
+
+def post_url(filename):
+    """Jekyll's default permalink for ``YYYY-MM-DD-<slug>.md``."""
+    date, slug = filename[:10], filename[11:-len(".md")]
+    return f"/{date.replace('-', '/')}/{slug}.html"
+
+
+def post_title(record):
+    return f"Claim {record['filename']}"
+
+
+def _source_html(source):
+    if not source:
+        return "No source available"
+    return f'<a href="{html.escape(source)}">{html.escape(source)}</a>'
+
+
+def shard_path(listing, shard):
+    return f"/archive/{listing}/page-{shard + 1}.html"
+
+
+def _listing_item(record):
+    return (
+        f'<h3><a href="{post_url(record["filename"])}">{html.escape(post_title(record))}</a></h3>\n'
+        f'<p><strong>Verified:</strong> {record["verified"]}<br />\n'
+        f'<strong>Source:</strong> {_source_html(record["source"])}</p>\n'
+        f'<p>{html.escape(record["statement"])}</p>\n'
+        f'<hr />'
+    )
+
+
+class SiteRenderer:
+    """
+    Renders pages for posts into ``output_dir``. ``render(filenames)``
+    re-renders what depends on those posts; the first run (or
+    ``render(None)``) renders everything.
+
+    Pages are identified as ``post:<filename>``, ``shard:<listing>:<n>``
+    and ``index``.
+    """
+
+    def __init__(self, post_store, output_dir, state_path, site_title, site_description, index_size=50, page_size=50):
+        self.post_store = post_store
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.site_title = site_title
+        self.site_description = site_description
+        self.index_size = index_size
+        self.page_size = page_size
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS pages (page TEXT PRIMARY KEY, inputs_hash TEXT NOT NULL, rendered_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS page_posts (page TEXT NOT NULL, filename TEXT NOT NULL, PRIMARY KEY (page, filename))")
+            conn.execute("CREATE INDEX IF NOT EXISTS page_posts_filename ON page_posts (filename)")
+            # Which shard of each listing a post was assigned to, and how many posts each listing has had.
+            conn.execute("CREATE TABLE IF NOT EXISTS shards (listing TEXT NOT NULL, filename TEXT NOT NULL, shard INTEGER NOT NULL, PRIMARY KEY (listing, filename))")
+            conn.execute("CREATE INDEX IF NOT EXISTS shards_filename ON shards (filename)")
+            conn.execute("CREATE INDEX IF NOT EXISTS shards_page ON shards (listing, shard)")
+            conn.execute("CREATE TABLE IF NOT EXISTS listings (listing TEXT PRIMARY KEY, assigned INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.state_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def listings_for(record):
+        """The listings a post appears in."""
+        return ["all", "verified" if record["verified"] else "unverified", record["filename"][:10]]
+
+    def _path(self, page):
+        if page == "index":
+            return os.path.join(self.output_dir, "index.html")
+        kind, _, name = page.partition(":")
+        if kind == "post":
+            return os.path.join(self.output_dir, post_url(name).lstrip("/"))
+        listing, _, shard = name.rpartition(":")
+        return os.path.join(self.output_dir, shard_path(listing, int(shard)).lstrip("/"))
+
+    def _assign_shards(self, conn, records):
+        """
+        Put each post into the newest shard of the listings it belongs to
+        (moving it out of listings it left, e.g. after a verdict change) and
+        return the shard pages that changed.
+        """
+        pages = set()
+        assigned = dict(conn.execute("SELECT listing, assigned FROM listings"))
+        for record in sorted(records, key=lambda record: record["published_at"]):
+            filename = record["filename"]
+            current = dict(conn.execute("SELECT listing, shard FROM shards WHERE filename = ?", (filename,)))
+            wanted = self.listings_for(record)
+            for listing, shard in current.items():
+                if listing not in wanted:
+                    conn.execute("DELETE FROM shards WHERE listing = ? AND filename = ?", (listing, filename))
+                    pages.add(f"shard:{listing}:{shard}")
+            for listing in wanted:
+                if listing in current:
+                    continue
+                count = assigned.get(listing, 0)
+                shard = count // self.page_size
+                conn.execute("INSERT INTO shards (listing, filename, shard) VALUES (?, ?, ?)", (listing, filename, shard))
+                assigned[listing] = count + 1
+                pages.add(f"shard:{listing}:{shard}")
+                if shard and count % self.page_size == 0:
+                    # The previous shard gains a link to the new one.
+                    pages.add(f"shard:{listing}:{shard - 1}")
+        conn.executemany("INSERT OR REPLACE INTO listings (listing, assigned) VALUES (?, ?)", assigned.items())
+        return pages
+
+    def _shard_count(self, listing):
+        with self._connect() as conn:
+            row = conn.execute("SELECT assigned FROM listings WHERE listing = ?", (listing,)).fetchone()
+        return (row[0] - 1) // self.page_size + 1 if row and row[0] else 0
+
+    def _shard_of(self, listing, filename):
+        with self._connect() as conn:
+            row = conn.execute("SELECT shard FROM shards WHERE listing = ? AND filename = ?", (listing, filename)).fetchone()
+        return row[0] if row else 0
+
+    def _records(self, page):
+        """The posts a page is rendered from, newest first."""
+        if page == "index":
+            return self.post_store.latest(self.index_size)
+        kind, _, name = page.partition(":")
+        if kind == "post":
+            return self.post_store.by_filenames([name])
+        listing, _, shard = name.rpartition(":")
+        with self._connect() as conn:
+            filenames = [row[0] for row in conn.execute(
+                "SELECT filename FROM shards WHERE listing = ? AND shard = ?", (listing, int(shard))
+            )]
+        return sorted(self.post_store.by_filenames(filenames), key=lambda record: record["published_at"], reverse=True)
+
+    def _context(self, page, records):
+        """Everything besides the posts that a page's HTML depends on."""
+        if page == "index":
+            return {"newest": {listing: self._shard_count(listing) - 1 for listing in ("all", "verified", "unverified")}}
+        kind, _, name = page.partition(":")
+        if kind == "post":
+            filename = records[0]["filename"]
+            return {"day_shard": self._shard_of(filename[:10], filename)}
+        listing, _, shard = name.rpartition(":")
+        return {"has_newer": int(shard) < self._shard_count(listing) - 1}
+
+    def _content(self, page, records, context):
+        items = "\n\n".join(_listing_item(record) for record in records)
+        if page == "index":
+            links = " | ".join(
+                f'<a href="{shard_path(listing, shard)}">{label}</a>'
+                for listing, label in (("all", "All fact checks"), ("verified", "Verified"), ("unverified", "Unverified"))
+                for shard in [context["newest"][listing]] if shard >= 0
+            )
+            return "Fact-Checked News", (
+                f"<h1>Fact-Checked News</h1>\n\n{INTRO}\n\n<p>Archive: {links}</p>\n\n"
+                f"<h2>Recent Fact Checks</h2>\n\n{items}"
+            )
+        kind, _, name = page.partition(":")
+        if kind == "post":
+            record = records[0]
+            date = record["filename"][:10]
+            return post_title(record), (
+                f"<h1>{html.escape(post_title(record))}</h1>\n"
+                f'<p><strong>Verified:</strong> {record["verified"]}<br />\n'
+                f'<strong>Source:</strong> {_source_html(record["source"])}</p>\n'
+                f'<p>{html.escape(record["statement"])}</p>\n'
+                f'<p><a href="{shard_path(date, context["day_shard"])}">More fact checks from {date}</a></p>'
+            )
+        listing, _, shard = name.rpartition(":")
+        shard = int(shard)
+        label = {"all": "All fact checks", "verified": "Verified claims", "unverified": "Unverified claims"}.get(
+            listing, f"Fact checks from {listing}"
+        )
+        navigation = []
+        if context["has_newer"]:
+            navigation.append(f'<a href="{shard_path(listing, shard + 1)}">Newer</a>')
+        if shard > 0:
+            navigation.append(f'<a href="{shard_path(listing, shard - 1)}">Older</a>')
+        title = f"{label}, page {shard + 1}"
+        return title, f"<h1>{html.escape(title)}</h1>\n\n{items}\n\n<p>{' | '.join(navigation)}</p>"
+
+    def _inputs_hash(self, records, context):
+        inputs = [RENDERER_VERSION, self.site_title, self.site_description, context] + [
+            [record["filename"], record["statement"], record["verified"], record["source"]] for record in records
+        ]
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def affected_pages(self, filenames):
+        """Pages that list these posts, besides their own pages and the index."""
+        pages = {"index"} | {f"post:{filename}" for filename in filenames}
+        filenames = list(filenames)
+        with self._connect() as conn:
+            for start in range(0, len(filenames), 500):
+                chunk = filenames[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT DISTINCT page FROM page_posts WHERE filename IN ({','.join('?' * len(chunk))})", chunk
+                )
+                pages.update(row[0] for row in rows)
+        return pages
+
+    def render(self, filenames=None):
+        """Re-render the pages depending on ``filenames`` (all posts if None); returns 0 like a build command."""
+        started = time.perf_counter()
+        with self._connect() as conn:
+            first_run = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0] == 0
+            rendered = dict(conn.execute("SELECT page, inputs_hash FROM pages"))
+        if filenames is None or first_run:
+            filenames = self.post_store.filenames()
+
+        records = self.post_store.by_filenames(filenames)
+        with self._connect() as conn:
+            shard_pages = self._assign_shards(conn, records)
+
+        written = 0
+        for page in sorted(self.affected_pages(filenames) | shard_pages):
+            records = self._records(page)
+            if not records and page.startswith("post:"):
+                continue
+            context = self._context(page, records)
+            inputs_hash = self._inputs_hash(records, context)
+            if rendered.get(page) == inputs_hash and os.path.exists(self._path(page)):
+                continue
+            title, content = self._content(page, records, context)
+            write_atomic(self._path(page), LAYOUT.format(
+                title=html.escape(title),
+                site_title=html.escape(self.site_title),
+                site_description=html.escape(self.site_description),
+                content=content
+            ))
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (page, inputs_hash, rendered_at) VALUES (?, ?, ?)",
+                    (page, inputs_hash, time.time())
+                )
+                conn.execute("DELETE FROM page_posts WHERE page = ?", (page,))
+                conn.executemany(
+                    "INSERT INTO page_posts (page, filename) VALUES (?, ?)",
+                    [(page, record["filename"]) for record in records]
+                )
+            written += 1
+
+        print(f"[SiteRenderer] Rendered {written} pages for {len(filenames)} posts in {time.perf_counter() - started:.2f}s")
+        return 0
@@ -0,0 +1,36 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Agents import their helpers as top-level modules (they run from their own
+# directory on sys.path), and shared modules from the repository root.
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "agents", "crawler_agent"))
+
+import shutil
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def mcp_server(tmp_path_factory):
+    """
+    The MCP server module, imported from a scratch directory so its
+    manifest, render state and site land there instead of in the repo.
+    """
+    for module in ("python_a2a", "groq", "dotenv", "yaml", "requests"):
+        pytest.importorskip(module)
+    workdir = tmp_path_factory.mktemp("mcp_server")
+    os.makedirs(workdir / "jekyll_site" / "_posts")
+    shutil.copy(os.path.join(ROOT, "jekyll_site", "_config.yml"), workdir / "jekyll_site")
+    previous = os.getcwd()
+    env = {key: os.environ.pop(key) for key in ("GROQ_API_KEY", "WIKIDATA_INDEX_PATH", "VERDICT_CACHE_PATH",
+                                                "EXTRACTION_CACHE_PATH") if key in os.environ}
+    os.chdir(workdir)
+    try:
+        import mcp_server
+    finally:
+        os.chdir(previous)
+        os.environ.update(env)
+    return mcp_server
@@ -0,0 +1,26 @@
+from article_filter import ArticleFilter
+
+
+def test_exclude_term_nested_in_a_longer_term_rejects():
+    article_filter = ArticleFilter(include=["opinion poll"], exclude=["opinion"])
+    assert article_filter.matched_groups("opinion poll on ai") == {"include", "exclude"}
+    assert not article_filter.accepts("opinion poll on ai")
+
+
+def test_include_term_overlapping_a_keyword_counts_for_both():
+    article_filter = ArticleFilter(include=["ai"], keywords=["ai safety"])
+    assert article_filter.accepts("ai safety news")
+
+
+def test_include_prefix_of_a_keyword_counts_for_both():
+    article_filter = ArticleFilter(include=["climate"], keywords=["climate change"])
+    assert article_filter.matched_groups("Climate change rises") == {"include", "keyword"}
+    assert article_filter.accepts("Climate change rises")
+
+
+def test_word_boundaries_and_required_groups():
+    article_filter = ArticleFilter(include=["ai"], exclude=["satire"], keywords=["election"])
+    assert not article_filter.accepts("said the election board")  # "ai" inside "said"
+    assert article_filter.accepts("AI and the  election")
+    assert not article_filter.accepts("AI election satire")
+    assert ArticleFilter().accepts("anything")
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+import pytest
+
+from claim_dedup import ClaimIndex, opposes
+from payloads import Claim
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Joe Biden is the president of the United States", "Joe Biden is not the president of the United States"),
+    ("The vaccine is safe for children", "The vaccine is unsafe for children"),
+    ("The new law is legal under the constitution", "The new law is illegal under the constitution"),
+    ("The senator has voted for the bill", "The senator has never voted for the bill"),
+    ("The company doesn't pay taxes in Ireland", "The company does pay taxes in Ireland"),
+])
+def test_negations_and_antonyms_are_not_merged(first, second):
+    index = ClaimIndex(threshold=0.5)
+    assert index.canonicalize([first, second]) == [first, second]
+
+
+def test_near_duplicates_and_numbers():
+    index = ClaimIndex()
+    statements = [
+        "Joe Biden is the president of the United States",
+        "Joe Biden is the President of the United States!",
+        "Inflation rose 3.2% in the eurozone last month",
+        "Inflation rose 3.5% in the eurozone last month",
+    ]
+    assert index.canonicalize(statements) == [statements[0], statements[0], statements[2], statements[3]]
+
+
+def test_opposes_only_looks_at_the_words_not_shared():
+    assert not opposes(frozenset("biden is not the president".split()), frozenset("biden is not the leader".split()))
+    assert not opposes(frozenset("the index rose".split()), frozenset("the index increased".split()))
+    assert opposes(frozenset("claims are true".split()), frozenset("claims are untrue".split()))
+
+
+def make_agent(claim_index):
+    for module in ("python_a2a", "yaml", "aiohttp"):
+        pytest.importorskip(module)
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agents", "fact_checker_agent"))
+    from fact_checker_agent import FactCheckerAgent
+
+    agent = FactCheckerAgent.__new__(FactCheckerAgent)
+    agent.claim_index = claim_index
+    return agent
+
+
+def test_fact_checker_keeps_each_statement_and_shares_the_verdict():
+    agent = make_agent(ClaimIndex())
+    claims = [
+        Claim(statement="Joe Biden is the president of the United States", article_id="a"),
+        Claim(statement="Joe Biden is not the president of the United States", article_id="b"),
+        Claim(statement="Joe Biden is the President of the United States.", article_id="c"),
+    ]
+    to_check, shared = agent.deduplicate(claims)
+    assert [claim.statement for claim in to_check] == [claims[0].statement, claims[1].statement]
+    assert shared == [0, 1, 0]
+
+    lookups = [{"verified": True, "source": "https://www.wikidata.org/wiki/Q6279"}, {"verified": False, "source": ""}]
+    verdicts = [agent.to_verdict(claim, lookups[i]) for claim, i in zip(claims, shared)]
+    assert [(v.statement, v.verified, v.article_id) for v in verdicts] == [
+        (claims[0].statement, True, "a"),
+        (claims[1].statement, False, "b"),
+        (claims[2].statement, True, "c"),
+    ]
+
+
+def test_rewording_from_an_earlier_run_is_looked_up_by_its_canonical_statement(tmp_path):
+    path = str(tmp_path / "claim_index.db")
+    make_agent(ClaimIndex(path=path)).deduplicate([Claim(statement="Paris is the capital of France", article_id="a")])
+
+    # A later run (a fresh agent) sees a rewording of the same claim.
+    agent = make_agent(ClaimIndex(path=path))
+    claim = Claim(statement="Paris is the capital of France.", article_id="b")
+    to_check, shared = agent.deduplicate([claim])
+
+    assert [c.statement for c in to_check] == ["Paris is the capital of France"]
+    verdict = agent.to_verdict(claim, {"verified": True, "source": "https://www.wikidata.org/wiki/Q90"})
+    assert (verdict.statement, verdict.article_id) == (claim.statement, "b")
+
+
+def test_index_is_bounded_in_memory_and_on_disk(tmp_path):
+    path = str(tmp_path / "claim_index.db")
+    index = ClaimIndex(path=path, max_claims=3)
+    statements = [f"Claim number {word} about the weather" for word in ("one", "two", "three", "four", "five")]
+    for statement in statements:
+        index.canonicalize([statement])
+
+    assert len(index) == 3
+    assert len(ClaimIndex(path=path, max_claims=3)) == 3
+    # The oldest claims are forgotten, so they start a new group again.
+    assert index.canonicalize(["claim number ONE about the weather"]) == ["claim number ONE about the weather"]
+    assert index.canonicalize(["claim number five about the weather!"]) == [statements[4]]
+
+
+def test_claims_expire_at_runtime(monkeypatch):
+    index = ClaimIndex(ttl_days=1)
+    index.canonicalize(["The river flooded the town"])
+    later = time.time() + 2 * 24 * 3600
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert index.canonicalize(["The river flooded the town!"]) == ["The river flooded the town!"]
+    assert len(index) == 1
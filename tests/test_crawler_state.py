@@ -0,0 +1,32 @@
+import time
+
+from feed_cache import FeedCache
+from seen_store import SeenStore
+
+
+def test_staged_validators_are_kept_for_feeds_with_unsent_articles(tmp_path):
+    cache = FeedCache(str(tmp_path / "feed_cache.json"))
+    cache.update("https://a.example/feed", etag='"a1"', body_hash="h-a")
+    cache.update("https://b.example/feed", etag='"b1"', body_hash="h-b")
+    # Before commit the old (empty) validators are still used for requests.
+    assert cache.request_headers("https://a.example/feed") == {}
+
+    cache.commit(skip={"https://b.example/feed"})
+    cache.save()
+
+    reloaded = FeedCache(str(tmp_path / "feed_cache.json"))
+    assert reloaded.request_headers("https://a.example/feed") == {"If-None-Match": '"a1"'}
+    # The feed with a backlog is fetched unconditionally next time.
+    assert reloaded.request_headers("https://b.example/feed") == {}
+    assert reloaded.get("https://b.example/feed") == {}
+
+
+def test_seen_store_prune_forgets_expired_ids(tmp_path):
+    store = SeenStore(str(tmp_path / "seen.db"), ttl_days=1)
+    store.mark_seen(["old", "new"])
+    with store._connect() as conn:
+        conn.execute("UPDATE seen SET seen_at = ? WHERE id = 'old'", (time.time() - 2 * 24 * 3600,))
+
+    assert store.prune() == 1
+    articles = [{"id": "old"}, {"id": "new"}]
+    assert store.filter_new(articles) == [{"id": "old"}]
@@ -0,0 +1,19 @@
+def test_partial_chunk_failure_is_not_cached(mcp_server, monkeypatch):
+    monkeypatch.setattr(mcp_server, "chunk_text", lambda text: ["chunk 1", "chunk 2", "chunk 3"])
+
+    def flaky(chunk, priority):
+        if chunk == "chunk 2":
+            raise RuntimeError("429 Too Many Requests")
+        return [f"claim {chunk[-1]}"]
+
+    monkeypatch.setattr(mcp_server, "_extract_claims_text", flaky)
+    text = "A long article that failed halfway."
+    key = mcp_server.extraction_cache_key(text)
+
+    assert mcp_server._extract_claims_single(text) == ["claim 1", "claim 3"]
+    assert mcp_server.extraction_cache.get(key) is None
+
+    # Once every chunk succeeds the complete result is cached.
+    monkeypatch.setattr(mcp_server, "_extract_claims_text", lambda chunk, priority: [f"claim {chunk[-1]}"])
+    assert mcp_server._extract_claims_single(text) == ["claim 1", "claim 2", "claim 3"]
+    assert mcp_server.extraction_cache.get(key) == ["claim 1", "claim 2", "claim 3"]
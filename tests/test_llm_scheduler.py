@@ -0,0 +1,126 @@
+"""
+LLMScheduler against a fake OpenAI-compatible chat completions server that
+answers with Groq-style rate-limit headers and 429s.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from llm_scheduler import LLMScheduler, RateLimitExceeded, parse_duration
+
+
+class FakeLLMServer:
+    """Serves the queued (status, headers) replies in order, then plain 200s."""
+
+    def __init__(self):
+        self.replies = []
+        self.request_times = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.request_times.append(time.monotonic())
+                status, headers = server.replies.pop(0) if server.replies else (200, {})
+                body = json.dumps({
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "[]"}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+                } if status == 200 else {"error": {"message": "Rate limit reached"}}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def request(self):
+        """A scheduler request function mapping 429s the way mcp_server._groq_request does."""
+        request = urllib.request.Request(
+            f"{self.url}/openai/v1/chat/completions",
+            data=json.dumps({"messages": [{"role": "user", "content": "hi"}]}).encode(),
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            headers = {k.lower(): v for k, v in e.headers.items()}
+            if e.code in (429, 503):
+                raise RateLimitExceeded(str(e), retry_after=parse_duration(headers.get("retry-after")), headers=headers)
+            raise
+        return payload["choices"][0]["message"]["content"], headers, payload["usage"]["total_tokens"]
+
+
+@pytest.fixture
+def fake_llm():
+    server = FakeLLMServer()
+    yield server
+    server.httpd.shutdown()
+
+
+def make_scheduler(**kwargs):
+    return LLMScheduler(requests_per_minute=6000, tokens_per_minute=600000, max_concurrency=1, **kwargs)
+
+
+def test_429_holds_requests_for_retry_after_and_retries(fake_llm):
+    fake_llm.replies = [(429, {"retry-after": "0.4"})]
+    scheduler = make_scheduler()
+
+    assert scheduler.run(fake_llm.request, estimated_tokens=10) == "[]"
+
+    first, retry = fake_llm.request_times
+    assert retry - first >= 0.4
+    stats = scheduler.stats()
+    assert (stats["rate_limited"], stats["retried"], stats["completed"]) == (1, 1, 1)
+
+
+def test_gives_up_after_max_attempts(fake_llm):
+    fake_llm.replies = [(429, {"retry-after": "0"})] * 3
+    scheduler = make_scheduler(max_attempts=3)
+
+    with pytest.raises(RateLimitExceeded):
+        scheduler.run(fake_llm.request, estimated_tokens=10)
+    assert len(fake_llm.request_times) == 3
+
+
+def test_remaining_tokens_header_throttles_the_minute_bucket(fake_llm):
+    fake_llm.replies = [(200, {"x-ratelimit-remaining-tokens": "0"})]
+    # 6000 tokens per minute refill at 100 per second.
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=6000, max_concurrency=1)
+
+    scheduler.run(fake_llm.request, estimated_tokens=10)
+    scheduler.run(fake_llm.request, estimated_tokens=30)
+
+    first, second = fake_llm.request_times
+    assert second - first >= 0.25
+
+
+def test_remaining_requests_header_is_a_daily_allowance(fake_llm):
+    # Plenty left today: the per-minute request bucket is not clamped to it.
+    fake_llm.replies = [(200, {"x-ratelimit-remaining-requests": "3", "x-ratelimit-reset-requests": "2m"})]
+    scheduler = make_scheduler()
+    scheduler.run(fake_llm.request, estimated_tokens=10)
+    assert scheduler.stats()["daily_requests_remaining"] == 3
+    assert scheduler.stats()["requests_available"] > 3
+
+    # Used up: requests wait for the daily reset instead of the minute refill.
+    fake_llm.replies = [(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "0.5s"})]
+    scheduler.run(fake_llm.request, estimated_tokens=10)
+    scheduler.run(fake_llm.request, estimated_tokens=10)
+
+    _, exhausted, after_reset = fake_llm.request_times
+    assert after_reset - exhausted >= 0.45
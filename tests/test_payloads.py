@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from payloads import Claim, PayloadError, decode, encode, is_envelope
+
+
+def test_envelope_detection_ignores_spacing_and_key_order():
+    compact = encode("claims", [Claim(statement="The sky is blue", article_id="a")])
+    spaced = json.dumps({"kind": "claims", "items": [{"statement": "The sky is blue"}], "v": 1}, indent=2)
+
+    assert is_envelope(compact)
+    assert is_envelope(" \n" + spaced)
+    assert decode(spaced, "claims") == [Claim(statement="The sky is blue")]
+
+
+@pytest.mark.parametrize("text", [
+    "The sky is blue",
+    '["The sky is blue"]',
+    '{"statement": "The sky is blue"}',
+    '{"v": 1, "kind": "claims"',  # truncated
+    "{not json}",
+    "",
+])
+def test_legacy_text_is_not_an_envelope(text):
+    assert not is_envelope(text)
+
+
+def test_decode_rejects_other_versions_and_kinds():
+    with pytest.raises(PayloadError):
+        decode('{"v": 2, "kind": "claims", "items": []}', "claims")
+    with pytest.raises(PayloadError):
+        decode(encode("claims", []), "verdicts")
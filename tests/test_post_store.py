@@ -0,0 +1,82 @@
+import os
+import shutil
+
+from post_store import PostStore, post_key as key_fn
+from site_renderer import SiteRenderer
+
+LEGACY_POSTS = os.path.join(os.path.dirname(__file__), "..", "jekyll_site", "_posts")
+
+
+def legacy_dir(tmp_path):
+    posts_dir = tmp_path / "_posts"
+    shutil.copytree(LEGACY_POSTS, posts_dir)
+    return str(posts_dir)
+
+
+def test_legacy_posts_are_indexed_by_claim_key(tmp_path):
+    posts_dir = legacy_dir(tmp_path)
+    legacy = sorted(os.listdir(posts_dir))
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+
+    assert sorted(store.imported) == legacy
+    assert sorted(store.filenames()) == legacy
+    for record in store.by_filenames(legacy):
+        assert record["key"] == key_fn(record["statement"])
+
+    # Restarting indexes nothing twice.
+    assert PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn).imported == []
+
+
+def test_republishing_a_legacy_claim_updates_its_file(tmp_path):
+    posts_dir = legacy_dir(tmp_path)
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+    record = store.by_filenames([sorted(os.listdir(posts_dir))[0]])[0]
+
+    [(fname, changed)] = store.write_many([(record["key"], record["statement"], True, "https://www.wikidata.org/wiki/Q1")])
+
+    assert (fname, changed) == (record["filename"], True)
+    assert len(os.listdir(posts_dir)) == len(store)
+
+
+def test_legacy_claim_republished_with_other_punctuation_updates_its_file(tmp_path):
+    posts_dir = legacy_dir(tmp_path)
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+    record = store.by_filenames([sorted(os.listdir(posts_dir))[0]])[0]
+    # The legacy statement ends with a period; the server normalizes punctuation away.
+    reworded = record["statement"].rstrip(".").upper() + "!"
+
+    [(fname, changed)] = store.write_many([(key_fn(reworded), reworded, False, "")])
+
+    assert fname == record["filename"]
+    assert len(os.listdir(posts_dir)) == len(store)
+
+
+def test_server_uses_the_shared_post_key(mcp_server):
+    assert mcp_server.post_key is key_fn
+    assert mcp_server.post_store.key_fn is key_fn
+
+
+def test_posts_missing_from_an_existing_manifest_are_picked_up(tmp_path):
+    posts_dir = str(tmp_path / "_posts")
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+    store.write_many([(key_fn("The sky is blue"), "The sky is blue", True, "")])
+    for fname in os.listdir(LEGACY_POSTS):
+        shutil.copy(os.path.join(LEGACY_POSTS, fname), posts_dir)
+
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+    assert sorted(store.imported) == sorted(os.listdir(LEGACY_POSTS))
+    assert len(store) == len(os.listdir(LEGACY_POSTS)) + 1
+
+
+def test_rendered_site_includes_legacy_posts(tmp_path):
+    posts_dir = legacy_dir(tmp_path)
+    store = PostStore(posts_dir, str(tmp_path / "manifest.db"), key_fn=key_fn)
+    renderer = SiteRenderer(store, str(tmp_path / "_site"), str(tmp_path / "render.db"), "Site", "")
+    renderer.render()
+
+    with open(tmp_path / "_site" / "index.html") as f:
+        index = f.read()
+    for fname in os.listdir(posts_dir):
+        date, slug = fname[:10], fname[11:-len(".md")]
+        assert f"/{date.replace('-', '/')}/{slug}.html" in index
+        assert os.path.exists(tmp_path / "_site" / date.replace("-", "/") / f"{slug}.html")
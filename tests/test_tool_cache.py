@@ -0,0 +1,32 @@
+import sqlite3
+import time
+
+from tool_cache import ToolCache
+
+
+def disk_keys(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT key FROM cache")}
+
+
+def test_disk_store_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(ToolCache, "TRIM_EVERY", 5)
+    path = str(tmp_path / "cache.db")
+    cache = ToolCache("test", max_entries=2, path=path, max_disk_entries=3)
+    for i in range(10):
+        cache.set(f"k{i}", i)
+    # Trimmed at the 5th and 10th write, keeping the newest entries.
+    assert disk_keys(path) == {"k7", "k8", "k9"}
+    # Evicted from memory but still on disk.
+    assert cache.get("k7") == 7
+
+
+def test_expired_entries_are_pruned_on_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(ToolCache, "TRIM_EVERY", 2)
+    path = str(tmp_path / "cache.db")
+    cache = ToolCache("test", ttl=60, path=path)
+    cache.set("old", 1)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE cache SET expires_at = ? WHERE key = 'old'", (time.time() - 1,))
+    cache.set("new", 2)
+    assert disk_keys(path) == {"new"}
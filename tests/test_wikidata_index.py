@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+import wikidata_index
+from wikidata_index import WikidataIndex, build_index
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "wikidata_subset.json")
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "wikidata.idx")
+    build_index(FIXTURE, path)
+    index = WikidataIndex(path)
+    yield index
+    index.close()
+
+
+def test_ambiguous_exact_label_resolves_to_lowest_qid(index):
+    assert index.resolve("Paris") == "Q90"
+    assert index.resolve("cambridge") == "Q350"
+    # Numeric, not lexicographic, QID order: Q308 < Q925 < Q1000001.
+    assert index.resolve("Mercury") == "Q308"
+
+
+def test_exact_label_beats_lower_qid_prefix_match(index):
+    # "Paris Hilton" (Q47899) also starts with "paris", but exact labels win.
+    assert index.resolve("PARIS!") == "Q90"
+    assert index.resolve("Paris, Texas") == "Q830149"
+
+
+def test_aliases_prefixes_and_misses(index):
+    assert index.resolve("City of Light") == "Q90"
+    assert index.resolve("Douglas Noel") is None  # accents are kept
+    assert index.resolve("Douglas Noël") == "Q42"
+    assert index.resolve("Paris Whit") == "Q47899"
+    assert index.resolve("Atlantis") is None
+    assert index.resolve("  ") is None
+    assert "Q925" in index.token("quicksilver")
+
+
+def test_lowest_qid_is_found_beyond_the_first_page_of_matches(tmp_path):
+    source = tmp_path / "subset.jsonl"
+    with open(source, "w", encoding="utf-8") as f:
+        for i in range(80):
+            # Keys sort alphabetically, so the lowest QID has the last label.
+            f.write(json.dumps({"id": f"Q{1000 - i}", "label": f"Springfield {i:03d}"}) + "\n")
+    path = str(tmp_path / "wikidata.idx")
+    build_index(str(source), path)
+    index = WikidataIndex(path)
+    try:
+        assert len(index.prefix("Springfield")) == 50
+        assert index.resolve("Springfield") == "Q921"
+    finally:
+        index.close()
+
+
+def test_exact_match_is_the_first_record_in_numeric_qid_order(tmp_path):
+    source = tmp_path / "subset.jsonl"
+    with open(source, "w", encoding="utf-8") as f:
+        for qid in ("Q9", "Q10", "Q100"):
+            f.write(json.dumps({"id": qid, "label": "Springfield"}) + "\n")
+    path = str(tmp_path / "wikidata.idx")
+    build_index(str(source), path)
+    index = WikidataIndex(path)
+    try:
+        # Byte order would put Q10 first.
+        assert index._scan(b"l:springfield", exact=True, limit=1) == [("springfield", "Q9")]
+        assert index.resolve("Springfield") == "Q9"
+    finally:
+        index.close()
+
+
+def test_prefix_scan_is_bounded(tmp_path, monkeypatch):
+    source = tmp_path / "subset.jsonl"
+    with open(source, "w", encoding="utf-8") as f:
+        for i in range(80):
+            f.write(json.dumps({"id": f"Q{1000 - i}", "label": f"Springfield {i:03d}"}) + "\n")
+    path = str(tmp_path / "wikidata.idx")
+    build_index(str(source), path)
+    monkeypatch.setattr(wikidata_index, "PREFIX_SCAN_LIMIT", 10)
+    index = WikidataIndex(path)
+    try:
+        # Only the first 10 keys ("springfield 000" .. "springfield 009") are looked at.
+        assert index.resolve("Springfield") == "Q991"
+    finally:
+        index.close()
+
+
+def test_index_files_of_an_older_version_are_rejected(tmp_path):
+    path = tmp_path / "old.idx"
+    path.write_bytes(b"WDIDX001" + bytes(8))
+    with pytest.raises(ValueError, match="rebuild"):
+        WikidataIndex(str(path))
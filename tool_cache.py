@@ -0,0 +1,134 @@
+"""
+In-memory LRU cache with TTL and an optional SQLite backing store, used by
+the MCP server to remember tool results across calls and restarts.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ToolCache:
+    """
+    Maps string keys to JSON-serialisable values.
+
+    At most ``max_entries`` live in memory (least recently used are evicted
+    first). Entries expire ``ttl`` seconds after being stored (``None`` means
+    never). With a ``path``, entries are also written to SQLite and read back
+    on memory misses, so they survive restarts. Every ``TRIM_EVERY`` writes,
+    expired rows are deleted from that file and ``max_disk_entries`` bounds
+    it by dropping the oldest entries.
+    """
+
+    # Trimming the SQLite file needs a COUNT(*), so only do it every so often.
+    TRIM_EVERY = 100
+
+    def __init__(self, name, max_entries=10000, ttl=None, path=None, max_disk_entries=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._writes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+                conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row and (row[1] is None or row[1] > now):
+                value = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._writes += 1
+            trim = self._writes % self.TRIM_EVERY == 0
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), expires_at, now)
+                )
+                if trim:
+                    self._trim(conn, now)
+
+    def _trim(self, conn, now):
+        """Delete expired rows, then the oldest ones beyond ``max_disk_entries``."""
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        if self.max_disk_entries is None:
+            return
+        excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at LIMIT ?)",
+                (excess,)
+            )
+
+    def _remember(self, key, expires_at, value):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": bool(self.path)
+            }
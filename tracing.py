@@ -0,0 +1,213 @@
+"""
+Span-style latency tracing shared by the orchestrator, the agents and the MCP client.
+
+A pipeline run is one trace whose id is the A2A ``conversation_id`` the
+orchestrator puts on every message it sends, so each agent records its
+spans against the same trace without any extra protocol. Spans are
+appended, one per line, to the JSONL file named by ``TRACE_PATH`` (default
+``traces.jsonl``, empty to disable); all processes of a local deployment
+share it. ``TRACE_FORMAT=otlp`` writes every line as an OTLP/JSON
+``resourceSpans`` document (readable by an OpenTelemetry collector's
+otlpjsonfile receiver) instead of a flat record.
+"""
+from contextlib import contextmanager
+import contextvars
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+import uuid
+
+# The span the current task is running in, so nested spans find their trace and parent.
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def trace_id_for(conversation_id):
+    """32-hex-digit trace id for a conversation id (UUIDs map to their hex form)."""
+    try:
+        return uuid.UUID(str(conversation_id)).hex
+    except ValueError:
+        return hashlib.sha256(str(conversation_id).encode()).hexdigest()[:32]
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.error = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": self.tracer.service,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+    def otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.tracer.service}}]},
+            "scopeSpans": [{"scope": {"name": "factcheck"}, "spans": [span]}]
+        }]}
+
+
+class Tracer:
+    """Records spans for one service (agent or server) to the shared trace file."""
+
+    def __init__(self, service, path=None, export_format="jsonl"):
+        self.service = service
+        self.path = path
+        self.export_format = export_format
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, service):
+        return cls(service, path=os.getenv("TRACE_PATH", "traces.jsonl") or None, export_format=os.getenv("TRACE_FORMAT", "jsonl"))
+
+    @contextmanager
+    def span(self, name, conversation_id=None, **attributes):
+        """
+        Time a block as a span. Without ``conversation_id`` the span joins the
+        trace of the enclosing span, if any; otherwise nothing is recorded.
+        """
+        parent = _current_span.get()
+        if conversation_id is not None:
+            trace_id, parent_id = trace_id_for(conversation_id), None
+            if parent is not None and parent.trace_id == trace_id:
+                parent_id = parent.span_id
+        elif parent is not None and parent.trace_id is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            # Untraced work still gets a span object, so callers can always call set().
+            trace_id, parent_id = None, None
+
+        span = Span(self, name, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if trace_id is not None:
+                self._export(span)
+
+    def _export(self, span):
+        if not self.path:
+            return
+        record = span.otlp() if self.export_format == "otlp" else span.record()
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            # One append per span; concurrent writers from other processes interleave by line.
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+async def traced_handler(tracer, message, handler):
+    """Run an agent's async message handler inside a span of the message's conversation."""
+    text = getattr(message.content, "text", "") or ""
+    with tracer.span("handle_message", conversation_id=message.conversation_id, request_bytes=len(text.encode())) as span:
+        response = await handler(message)
+        span.set(response_bytes=len((getattr(response.content, "text", "") or "").encode()))
+        return response
+
+
+def _normalize(record):
+    """Flat view of a span record in either export format."""
+    if "resourceSpans" not in record:
+        return record
+    resource = record["resourceSpans"][0]
+    service = next(
+        (attr["value"].get("stringValue") for attr in resource["resource"]["attributes"] if attr["key"] == "service.name"),
+        ""
+    )
+    span = resource["scopeSpans"][0]["spans"][0]
+    start_ns, end_ns = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+    return {
+        "trace_id": span["traceId"],
+        "service": service,
+        "name": span["name"],
+        "duration_ms": round((end_ns - start_ns) / 1e6, 3),
+        "error": span.get("status", {}).get("message", "")
+    }
+
+
+def read_spans(path, trace_id, offset=0):
+    """Spans of one trace written to ``path`` after byte ``offset``."""
+    spans = []
+    if not path or not os.path.exists(path):
+        return spans
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                record = _normalize(json.loads(line))
+            except (json.JSONDecodeError, KeyError, IndexError, ValueError):
+                continue
+            if record.get("trace_id") == trace_id:
+                spans.append(record)
+    return spans
+
+
+def breakdown(spans):
+    """Total time, call count and errors per (service, span name), slowest first."""
+    totals = {}
+    for span in spans:
+        entry = totals.setdefault((span["service"], span["name"]), {"calls": 0, "total_ms": 0.0, "errors": 0})
+        entry["calls"] += 1
+        entry["total_ms"] += span["duration_ms"]
+        entry["errors"] += bool(span.get("error"))
+    return sorted(
+        ({"service": service, "name": name, **entry} for (service, name), entry in totals.items()),
+        key=lambda entry: entry["total_ms"],
+        reverse=True
+    )
+
+
+def format_breakdown(rows):
+    lines = ["⏱️ Timing breakdown:"]
+    for row in rows:
+        errors = f", {row['errors']} failed" if row["errors"] else ""
+        lines.append(f"  {row['service']} {row['name']}: {row['total_ms'] / 1000:.2f}s over {row['calls']} call(s){errors}")
+    return "\n".join(lines)
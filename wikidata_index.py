@@ -0,0 +1,203 @@
+"""
+Offline Wikidata label/alias index for check_wikidata.
+
+Build a compact, memory-mapped index from a Wikidata JSON dump or any JSONL
+subset, then resolve statements locally without a network round-trip:
+
+    python wikidata_index.py build latest-all.json wikidata.idx --lang en
+    python wikidata_index.py lookup wikidata.idx "Douglas Adams"
+
+Input lines may be full Wikidata entities ({"id", "labels", "aliases"}, as in
+the official dump, with or without its surrounding "[" / "]" and trailing
+commas) or simplified records ({"id", "label", "aliases": [...]}).
+
+File layout: an 8-byte magic, a uint64 record count, a table of uint64 record
+offsets, then the records ``key\\tQID\\n`` sorted by key bytes and then by
+numeric QID, so the first record of a key holds its lowest QID. Keys are
+normalized labels and aliases (``l:`` prefix) and their individual tokens
+(``t:`` prefix), so both prefix and token lookups are binary searches over
+the mapped file. Records are sorted in memory, which is fine for subsets;
+full dumps need a machine with enough RAM for the key list.
+"""
+import argparse
+import json
+import mmap
+import re
+import struct
+import sys
+import time
+
+# Version 2 orders the QIDs of a key numerically; version 1 files must be rebuilt.
+MAGIC = b"WDIDX002"
+HEADER = struct.Struct("<8sQ")
+OFFSET = struct.Struct("<Q")
+MIN_TOKEN_LENGTH = 3
+# Prefix matches resolve() looks at when no label matches exactly.
+PREFIX_SCAN_LIMIT = 1000
+
+
+def qid_number(qid):
+    """Numeric part of a QID for ordering ("Q42" -> 42); malformed ids sort last."""
+    return int(qid[1:]) if qid[1:].isdigit() else sys.maxsize
+
+
+def normalize_label(text):
+    """Casefold and strip punctuation the same way for labels and queries."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
+
+
+def _entity_names(entity, lang):
+    if "labels" in entity:
+        label = entity.get("labels", {}).get(lang, {}).get("value")
+        aliases = [alias.get("value") for alias in entity.get("aliases", {}).get(lang, [])]
+    else:
+        label = entity.get("label")
+        aliases = entity.get("aliases", [])
+    return [name for name in [label, *aliases] if name]
+
+
+def _read_entities(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line or line in ("[", "]"):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"[wikidata_index] Skipping malformed line: {line[:80]}")
+
+
+def build_index(source_path, index_path, lang="en"):
+    """Build an index file from a dump or JSONL subset; returns the record count."""
+    records = set()
+    for entity in _read_entities(source_path):
+        qid = entity.get("id")
+        if not qid:
+            continue
+        for name in _entity_names(entity, lang):
+            key = normalize_label(name)
+            if not key:
+                continue
+            records.add((f"l:{key}".encode(), qid.encode()))
+            for token in key.split():
+                if len(token) >= MIN_TOKEN_LENGTH:
+                    records.add((f"t:{token}".encode(), qid.encode()))
+
+    sorted_records = sorted(records, key=lambda record: (record[0], qid_number(record[1].decode()), record[1]))
+    offsets, blob, position = [], [], 0
+    for key, qid in sorted_records:
+        record = key + b"\t" + qid + b"\n"
+        offsets.append(position)
+        blob.append(record)
+        position += len(record)
+
+    with open(index_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(sorted_records)))
+        for offset in offsets:
+            f.write(OFFSET.pack(offset))
+        f.write(b"".join(blob))
+    return len(sorted_records)
+
+
+class WikidataIndex:
+    """Read-only view of an index file, memory-mapped so lookups touch only a few pages."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Wikidata index file of this version; rebuild it with `python wikidata_index.py build`")
+        self._data_start = HEADER.size + self.count * OFFSET.size
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _record(self, i):
+        start = self._data_start + OFFSET.unpack_from(self._map, HEADER.size + i * OFFSET.size)[0]
+        end = self._map.find(b"\n", start)
+        key, _, qid = self._map[start:end].partition(b"\t")
+        return key, qid.decode()
+
+    def _lower_bound(self, key):
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._record(mid)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _scan(self, prefix, exact=False, limit=50):
+        """Records whose key starts with (or, with ``exact``, equals) ``prefix``, at most ``limit``."""
+        results = []
+        i = self._lower_bound(prefix)
+        while i < self.count and len(results) < limit:
+            key, qid = self._record(i)
+            if not key.startswith(prefix) or (exact and key != prefix):
+                break
+            results.append((key[2:].decode(), qid))
+            i += 1
+        return results
+
+    def prefix(self, text, limit=50):
+        """Entities with a label or alias starting with ``text``, as (label, QID) pairs."""
+        return self._scan(f"l:{normalize_label(text)}".encode(), limit=limit)
+
+    def token(self, word, limit=50):
+        """Entities with ``word`` as one of the tokens of a label or alias."""
+        return [qid for _, qid in self._scan(f"t:{normalize_label(word)}".encode(), exact=True, limit=limit)]
+
+    def resolve(self, statement):
+        """
+        Resolve a statement the way wbsearchentities does (prefix match on
+        labels and aliases): an exact label wins, otherwise the lowest QID.
+        Returns None on a miss so callers can fall back to the remote API.
+
+        QIDs of a key are stored lowest first, so an exact match is the first
+        record found. Otherwise the lowest QID among the first
+        ``PREFIX_SCAN_LIMIT`` prefix matches is returned, which keeps very
+        short prefixes on a full dump bounded.
+        """
+        key = f"l:{normalize_label(statement)}".encode()
+        if key == b"l:":
+            return None
+        exact = self._scan(key, exact=True, limit=1)
+        if exact:
+            return exact[0][1]
+        candidates = [qid for _, qid in self._scan(key, limit=PREFIX_SCAN_LIMIT)]
+        return min(candidates, key=qid_number) if candidates else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query an offline Wikidata label index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Build an index from a Wikidata dump or JSONL subset")
+    build.add_argument("source")
+    build.add_argument("index")
+    build.add_argument("--lang", default="en")
+
+    lookup = subparsers.add_parser("lookup", help="Resolve a statement against an index")
+    lookup.add_argument("index")
+    lookup.add_argument("statement")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_index(args.source, args.index, lang=args.lang)
+        print(f"Wrote {count} records to {args.index} in {time.perf_counter() - start:.1f}s")
+    else:
+        index = WikidataIndex(args.index)
+        start = time.perf_counter()
+        qid = index.resolve(args.statement)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"{qid or 'miss'} ({elapsed_us:.0f} µs)")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()